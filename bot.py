@@ -6,17 +6,35 @@
 # -------------------------
 # Imports
 # -------------------------
+import io
 import os
+import re
+import hmac
+import html
+import json
+import base64
+import hashlib
+import secrets
 import time
+import socket
+import sqlite3
+import heapq
 import random
+import bisect
 import asyncio
 import threading
 import traceback
+from collections import deque
 from typing import Dict, List, Tuple
 
+import aiohttp
+import jinja2
 import requests
+from aiohttp import web
+from requests.adapters import HTTPAdapter
 import discord
 from discord import app_commands, Embed, Object
+from discord.http import Route
 from discord.ext import commands
 from discord.ui import View, Select
 from flask import Flask, request, redirect, render_template, render_template_string
@@ -129,11 +147,96 @@ CLIENT_ID     = os.getenv("CLIENT_ID") or "1397974568706117774"
 CLIENT_SECRET = os.getenv("CLIENT_SECRET") or "KcaapGwCEsH_JDlIbrAX3lghSC-tDREN"
 REDIRECT_URI  = "https://auth.grantrp.com/auth"
 
+# -------------------------
+# Web Server
+# -------------------------
+BASE_DIR        = os.path.dirname(os.path.abspath(__file__))
+# "flask" (thread) | "aiohttp" (bot loop) | "none" (web served by separate workers,
+# e.g. `gunicorn -w 4 bot:flask_app` with STATE_BACKEND=sqlite or redis)
+WEB_SERVER_MODE = os.getenv("WEB_SERVER_MODE", "flask").lower()
+# /metrics sits on the public auth domain: with METRICS_TOKEN set it needs
+# `Authorization: Bearer <token>`, without it only loopback requests are served.
+METRICS_TOKEN   = os.getenv("METRICS_TOKEN", "")
+
+# -------------------------
+# Shared State Backend
+# -------------------------
+STATE_BACKEND     = os.getenv("STATE_BACKEND", "memory").lower()  # memory | sqlite | redis
+STATE_SQLITE_PATH = os.getenv("STATE_SQLITE_PATH", os.path.join(BASE_DIR, "grn_state.db"))
+STATE_REDIS_URL   = os.getenv("STATE_REDIS_URL", "redis://127.0.0.1:6379/0")
+
+# -------------------------
+# Application Checkpoints (local, survive restarts)
+# -------------------------
+CHECKPOINT_PATH          = os.getenv("CHECKPOINT_PATH", os.path.join(BASE_DIR, "grn_checkpoints.db"))
+CHECKPOINT_FLUSH_SECONDS = 2
+
+# -------------------------
+# Application Archive (submissions + decisions, full-text searchable)
+# -------------------------
+ARCHIVE_PATH      = os.getenv("ARCHIVE_PATH", os.path.join(BASE_DIR, "grn_archive.db"))
+ARCHIVE_PAGE_SIZE = 5
+
+# Near-duplicate detection: 128-value MinHash split into 32 LSH bands of 4 rows.
+# The banding threshold (~0.42) sits well below SIMILARITY_FLAG, so ~99% of 60%-similar
+# pairs become candidates; the exact MinHash score then decides what gets flagged.
+MINHASH_PERMS   = 128
+LSH_BANDS       = 32
+SHINGLE_WORDS   = 3
+SIMILARITY_FLAG = float(os.getenv("SIMILARITY_FLAG", "0.6"))
+
 # -------------------------
 # Timing / Expiry
 # -------------------------
 APP_TOTAL_TIME_SECONDS = 35 * 60  # 35 minutes per application
 CODE_TTL_SECONDS       = 5 * 60   # 5 minutes per auth code
+REAPPLY_COOLDOWN_SECONDS = 12 * 60 * 60  # wait after a denial
+
+# -------------------------
+# Auth Code Mode
+# -------------------------
+# "stored" → PIN kept in state_store until redeemed
+# "signed" → HMAC-signed link carries the grant; only a replay cache is stored
+# The signing key must be its own secret — never the OAuth client secret.
+AUTH_CODE_MODE   = os.getenv("AUTH_CODE_MODE", "stored").lower()
+AUTH_SIGNING_KEY = os.getenv("AUTH_SIGNING_KEY", "").encode()
+if AUTH_CODE_MODE == "signed" and not AUTH_SIGNING_KEY:
+    raise RuntimeError("AUTH_CODE_MODE=signed requires AUTH_SIGNING_KEY")
+
+# Accepting an application issues its auth code automatically (no separate /auth_grant).
+# Optional delay, and optional batch window that due grants are rounded up to.
+AUTO_GRANT_ON_ACCEPT     = os.getenv("AUTO_GRANT_ON_ACCEPT", "1") == "1"
+AUTO_GRANT_DELAY_SECONDS = int(os.getenv("AUTO_GRANT_DELAY_SECONDS", "0"))
+AUTO_GRANT_BATCH_SECONDS = int(os.getenv("AUTO_GRANT_BATCH_SECONDS", "0"))
+
+# Bulk staff actions (/auth_grant_bulk, /app_review_batch)
+BULK_DM_CONCURRENCY = 5    # DMs in flight per batch
+BULK_GRANT_MAX      = 100  # members per bulk grant
+
+# -------------------------
+# Staff Log Sink
+# -------------------------
+LOG_FLUSH_SECONDS = 3
+LOG_BUFFER_MAX    = 500   # buffered entries across all channels before dropping low-priority ones
+# Optional channel webhooks — deliveries then use the webhook's rate limit, not the bot's
+LOG_WEBHOOKS = {
+    AUTH_CODE_LOG_CHANNEL: os.getenv("AUTH_LOG_WEBHOOK_URL", ""),
+    DECISION_LOG_CHANNEL:  os.getenv("DECISION_LOG_WEBHOOK_URL", ""),
+}
+
+# -------------------------
+# Application Mode
+# -------------------------
+# Departments listed here answer via modal pages instead of one DM per question
+MODAL_MODE_DEPTS = {d.strip().upper() for d in os.getenv("MODAL_MODE_DEPTS", "").split(",") if d.strip()}
+MODAL_PAGE_SIZE  = 5  # Discord caps modals at 5 text inputs
+
+# -------------------------
+# Admission Control (recruitment surges)
+# -------------------------
+MAX_ACTIVE_APPLICATIONS  = int(os.getenv("MAX_ACTIVE_APPLICATIONS", "40"))  # 0 = no cap
+ADMISSION_UPDATE_SECONDS = 20       # how often queued users' "#N in line" notes refresh
+ADMISSION_DEFAULT_APP_SECONDS = 12 * 60  # ETA basis until real durations are known
 
 # -------------------------
 # Bot Setup
@@ -144,15 +247,666 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 tree = bot.tree
 
 # -------------------------
-# In-memory Stores
+# Shared State Store
+# -------------------------
+# Namespaced JSON records shared by the bot and any web workers.
+#   memory → single process (default)
+#   sqlite → WAL database, safe for several processes on one host
+#   redis  → any Redis-protocol server (multi-host)
+class StateStore:
+    """Interface for the shared state backends.
+
+    Records put with a `ttl` are indexed by expiry so a single sweeper can
+    evict them with pop_expired() instead of scanning the namespace.
+    """
+
+    def get(self, ns: str, key) -> dict | None:
+        raise NotImplementedError
+
+    def put(self, ns: str, key, value: dict, ttl: float | None = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, ns: str, key) -> None:
+        raise NotImplementedError
+
+    def take(self, ns: str, key) -> dict | None:
+        """Atomically read and delete a record (redeem-once)."""
+        raise NotImplementedError
+
+    def add(self, ns: str, key, value: dict, ttl: float | None = None) -> bool:
+        """Store only if the key is absent; True if this call created it."""
+        raise NotImplementedError
+
+    def items(self, ns: str) -> List[Tuple[str, dict]]:
+        raise NotImplementedError
+
+    def count(self, ns: str) -> int:
+        return len(self.items(ns))
+
+    def pop_expired(self, ns: str, now: float, limit: int = 500) -> List[Tuple[str, dict, float]]:
+        """Remove and return (key, value, expires_at) for records past their expiry."""
+        raise NotImplementedError
+
+    def next_expiry(self, ns: str) -> float | None:
+        raise NotImplementedError
+
+class MemoryStateStore(StateStore):
+    def __init__(self):
+        self._data: Dict[str, Dict[str, dict]] = {}
+        self._expiry: Dict[str, Dict[str, float]] = {}             # ns → key → expires_at
+        self._heaps: Dict[str, List[Tuple[float, str]]] = {}       # ns → min-heap (expires_at, key)
+        self._lock = threading.Lock()
+
+    def _forget(self, ns: str, key: str):
+        # Heap entries are dropped lazily when they reach the top
+        self._expiry.get(ns, {}).pop(key, None)
+
+    def _heap_top(self, ns: str) -> Tuple[float, str] | None:
+        heap = self._heaps.get(ns, [])
+        expiry = self._expiry.get(ns, {})
+        while heap and expiry.get(heap[0][1]) != heap[0][0]:
+            heapq.heappop(heap)
+        return heap[0] if heap else None
+
+    def get(self, ns, key):
+        with self._lock:
+            return self._data.get(ns, {}).get(str(key))
+
+    def put(self, ns, key, value, ttl=None):
+        key = str(key)
+        with self._lock:
+            self._data.setdefault(ns, {})[key] = value
+            self._forget(ns, key)
+            if ttl is not None:
+                expires_at = time.time() + ttl
+                self._expiry.setdefault(ns, {})[key] = expires_at
+                heapq.heappush(self._heaps.setdefault(ns, []), (expires_at, key))
+
+    def delete(self, ns, key):
+        with self._lock:
+            self._data.get(ns, {}).pop(str(key), None)
+            self._forget(ns, str(key))
+
+    def take(self, ns, key):
+        with self._lock:
+            self._forget(ns, str(key))
+            return self._data.get(ns, {}).pop(str(key), None)
+
+    def add(self, ns, key, value, ttl=None):
+        key = str(key)
+        with self._lock:
+            if key in self._data.get(ns, {}):
+                return False
+            self._data.setdefault(ns, {})[key] = value
+            if ttl is not None:
+                expires_at = time.time() + ttl
+                self._expiry.setdefault(ns, {})[key] = expires_at
+                heapq.heappush(self._heaps.setdefault(ns, []), (expires_at, key))
+            return True
+
+    def items(self, ns):
+        with self._lock:
+            return list(self._data.get(ns, {}).items())
+
+    def count(self, ns):
+        with self._lock:
+            return len(self._data.get(ns, {}))
+
+    def pop_expired(self, ns, now, limit=500):
+        out = []
+        with self._lock:
+            while len(out) < limit and (top := self._heap_top(ns)) and top[0] <= now:
+                expires_at, key = heapq.heappop(self._heaps[ns])
+                self._forget(ns, key)
+                if (value := self._data.get(ns, {}).pop(key, None)) is not None:
+                    out.append((key, value, expires_at))
+        return out
+
+    def next_expiry(self, ns):
+        with self._lock:
+            top = self._heap_top(ns)
+            return top[0] if top else None
+
+class SQLiteStateStore(StateStore):
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        db = self._conn()
+        db.execute("CREATE TABLE IF NOT EXISTS kv (ns TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, PRIMARY KEY (ns, key))")
+        if "expires_at" not in {row[1] for row in db.execute("PRAGMA table_info(kv)")}:
+            db.execute("ALTER TABLE kv ADD COLUMN expires_at REAL")
+        db.execute("CREATE INDEX IF NOT EXISTS kv_expiry ON kv (ns, expires_at) WHERE expires_at IS NOT NULL")
+
+    def _conn(self) -> sqlite3.Connection:
+        # sqlite3 connections are per-thread; Flask workers each get their own
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, ns, key):
+        row = self._conn().execute("SELECT value FROM kv WHERE ns=? AND key=?", (ns, str(key))).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, ns, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._conn().execute(
+            "INSERT INTO kv (ns, key, value, expires_at) VALUES (?, ?, ?, ?) "
+            "ON CONFLICT(ns, key) DO UPDATE SET value=excluded.value, expires_at=excluded.expires_at",
+            (ns, str(key), json.dumps(value), expires_at),
+        )
+
+    def delete(self, ns, key):
+        self._conn().execute("DELETE FROM kv WHERE ns=? AND key=?", (ns, str(key)))
+
+    def take(self, ns, key):
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            row = db.execute("SELECT value FROM kv WHERE ns=? AND key=?", (ns, str(key))).fetchone()
+            if row:
+                db.execute("DELETE FROM kv WHERE ns=? AND key=?", (ns, str(key)))
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return json.loads(row[0]) if row else None
+
+    def add(self, ns, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl is not None else None
+        cur = self._conn().execute(
+            "INSERT OR IGNORE INTO kv (ns, key, value, expires_at) VALUES (?, ?, ?, ?)",
+            (ns, str(key), json.dumps(value), expires_at),
+        )
+        return cur.rowcount == 1
+
+    def items(self, ns):
+        rows = self._conn().execute("SELECT key, value FROM kv WHERE ns=?", (ns,)).fetchall()
+        return [(k, json.loads(v)) for k, v in rows]
+
+    def count(self, ns):
+        return self._conn().execute("SELECT COUNT(*) FROM kv WHERE ns=?", (ns,)).fetchone()[0]
+
+    def pop_expired(self, ns, now, limit=500):
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute(
+                "SELECT key, value, expires_at FROM kv WHERE ns=? AND expires_at IS NOT NULL AND expires_at<=? "
+                "ORDER BY expires_at LIMIT ?", (ns, now, limit)
+            ).fetchall()
+            db.executemany("DELETE FROM kv WHERE ns=? AND key=?", [(ns, k) for k, _, _ in rows])
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return [(k, json.loads(v), exp) for k, v, exp in rows]
+
+    def next_expiry(self, ns):
+        return self._conn().execute(
+            "SELECT MIN(expires_at) FROM kv WHERE ns=? AND expires_at IS NOT NULL", (ns,)
+        ).fetchone()[0]
+
+class RedisStateStore(StateStore):
+    """Minimal RESP client — one hash per namespace plus a sorted set for expiries."""
+
+    def __init__(self, url: str):
+        parsed = urllib.parse.urlparse(url)
+        self.host = parsed.hostname or "127.0.0.1"
+        self.port = parsed.port or 6379
+        self.password = parsed.password
+        self.db = int((parsed.path or "/0").lstrip("/") or 0)
+        self.prefix = "grn:"
+        self._lock = threading.Lock()
+        self._sock: socket.socket | None = None
+        self._buf = b""
+
+    def _connect(self):
+        self._sock = socket.create_connection((self.host, self.port), timeout=10)
+        self._buf = b""
+        if self.password:
+            self._send("AUTH", self.password)
+        if self.db:
+            self._send("SELECT", self.db)
+
+    def _readline(self) -> bytes:
+        while b"\r\n" not in self._buf:
+            chunk = self._sock.recv(65536)
+            if not chunk:
+                raise ConnectionError("Redis connection closed")
+            self._buf += chunk
+        line, self._buf = self._buf.split(b"\r\n", 1)
+        return line
+
+    def _read_reply(self):
+        line = self._readline()
+        kind, rest = line[:1], line[1:]
+        if kind == b"+":
+            return rest.decode()
+        if kind == b"-":
+            raise RuntimeError(f"Redis error: {rest.decode()}")
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            n = int(rest)
+            if n < 0:
+                return None
+            while len(self._buf) < n + 2:
+                chunk = self._sock.recv(65536)
+                if not chunk:
+                    raise ConnectionError("Redis connection closed")
+                self._buf += chunk
+            data, self._buf = self._buf[:n], self._buf[n + 2:]
+            return data.decode()
+        if kind == b"*":
+            n = int(rest)
+            return None if n < 0 else [self._read_reply() for _ in range(n)]
+        raise RuntimeError(f"Unexpected Redis reply: {line!r}")
+
+    def _send(self, *args):
+        parts = [f"*{len(args)}\r\n".encode()]
+        for a in args:
+            b = str(a).encode()
+            parts.append(b"$%d\r\n%s\r\n" % (len(b), b))
+        self._sock.sendall(b"".join(parts))
+        return self._read_reply()
+
+    def _call(self, *commands):
+        """Run one or more commands on the shared connection; reconnect once on failure."""
+        with self._lock:
+            for attempt in (0, 1):
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    return [self._send(*c) for c in commands]
+                except (OSError, ConnectionError):
+                    self._sock = None
+                    if attempt:
+                        raise
+
+    def get(self, ns, key):
+        raw = self._call(("HGET", self.prefix + ns, key))[0]
+        return json.loads(raw) if raw else None
+
+    def put(self, ns, key, value, ttl=None):
+        h, z = self.prefix + ns, self.prefix + ns + ":ttl"
+        expiry = ("ZADD", z, time.time() + ttl, key) if ttl is not None else ("ZREM", z, key)
+        self._call(("MULTI",), ("HSET", h, key, json.dumps(value)), expiry, ("EXEC",))
+
+    def delete(self, ns, key):
+        h, z = self.prefix + ns, self.prefix + ns + ":ttl"
+        self._call(("MULTI",), ("HDEL", h, key), ("ZREM", z, key), ("EXEC",))
+
+    def take(self, ns, key):
+        h, z = self.prefix + ns, self.prefix + ns + ":ttl"
+        replies = self._call(("MULTI",), ("HGET", h, key), ("HDEL", h, key), ("ZREM", z, key), ("EXEC",))
+        raw = replies[-1][0] if replies[-1] else None
+        return json.loads(raw) if raw else None
+
+    def add(self, ns, key, value, ttl=None):
+        h, z = self.prefix + ns, self.prefix + ns + ":ttl"
+        if not self._call(("HSETNX", h, key, json.dumps(value)))[0]:
+            return False
+        if ttl is not None:
+            self._call(("ZADD", z, time.time() + ttl, key))
+        return True
+
+    def items(self, ns):
+        flat = self._call(("HGETALL", self.prefix + ns))[0] or []
+        return [(flat[i], json.loads(flat[i + 1])) for i in range(0, len(flat), 2)]
+
+    def count(self, ns):
+        return self._call(("HLEN", self.prefix + ns))[0]
+
+    def pop_expired(self, ns, now, limit=500):
+        z = self.prefix + ns + ":ttl"
+        flat = self._call(("ZRANGEBYSCORE", z, "-inf", now, "WITHSCORES", "LIMIT", 0, limit))[0] or []
+        out = []
+        for i in range(0, len(flat), 2):
+            key, expires_at = flat[i], float(flat[i + 1])
+            if (value := self.take(ns, key)) is not None:
+                out.append((key, value, expires_at))
+        return out
+
+    def next_expiry(self, ns):
+        flat = self._call(("ZRANGE", self.prefix + ns + ":ttl", 0, 0, "WITHSCORES"))[0] or []
+        return float(flat[1]) if flat else None
+
+def make_state_store() -> StateStore:
+    if STATE_BACKEND == "sqlite":
+        return SQLiteStateStore(STATE_SQLITE_PATH)
+    if STATE_BACKEND == "redis":
+        return RedisStateStore(STATE_REDIS_URL)
+    return MemoryStateStore()
+
+state_store = make_state_store()
+
+# Live application sessions for flows running in *this* process. Changes are
+# only marked dirty here; checkpoint_flusher() writes them behind the answer
+# path to state_store (shared view) and checkpoint_store (restart recovery).
+app_sessions: Dict[int, dict] = {}
+dirty_sessions: set[int] = set()
+
+checkpoint_store = SQLiteStateStore(CHECKPOINT_PATH)
+
+def save_session(user_id: int) -> None:
+    dirty_sessions.add(user_id)
+
+def drop_session(user_id: int) -> None:
+    app_sessions.pop(user_id, None)
+    dirty_sessions.add(user_id)
+
+def _write_checkpoints(batch: List[Tuple[int, dict | None]]) -> None:
+    for user_id, snapshot in batch:
+        if snapshot is None:
+            state_store.delete("app_sessions", user_id)
+            checkpoint_store.delete("app_checkpoints", user_id)
+        else:
+            state_store.put("app_sessions", user_id, snapshot)
+            checkpoint_store.put("app_checkpoints", user_id, snapshot)
+
+async def flush_checkpoints() -> None:
+    if not dirty_sessions:
+        return
+    # Snapshot on the loop thread so the writer never sees a half-updated dict
+    batch = []
+    for user_id in list(dirty_sessions):
+        sess = app_sessions.get(user_id)
+        batch.append((user_id, None if sess is None else {**sess, "answers": list(sess.get("answers", []))}))
+    dirty_sessions.clear()
+    await asyncio.to_thread(_write_checkpoints, batch)
+
+async def checkpoint_flusher():
+    while True:
+        await asyncio.sleep(CHECKPOINT_FLUSH_SECONDS)
+        try:
+            await flush_checkpoints()
+        except Exception as e:
+            print("checkpoint flush error:", e)
+
+# -------------------------
+# Application Archive
 # -------------------------
-app_sessions: Dict[int, dict]  = {}  # Application progress
-pending_codes: Dict[int, dict] = {}  # Pending auth codes
+_MERSENNE_61 = (1 << 61) - 1
+_rng = random.Random(0x67726E)  # fixed seed — stored signatures must stay comparable across restarts
+MINHASH_COEFFS = [(_rng.randrange(1, _MERSENNE_61), _rng.randrange(_MERSENNE_61)) for _ in range(MINHASH_PERMS)]
+
+def minhash_signature(answers: List[str]) -> List[int] | None:
+    """MinHash over word shingles of the answers (None when there's nothing to fingerprint)."""
+    words = re.findall(r"\w+", " ".join(answers).lower())
+    if not words:
+        return None
+    shingles = {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(max(1, len(words) - SHINGLE_WORDS + 1))}
+    hashes = [int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") % _MERSENNE_61 for s in shingles]
+    return [min((a * h + b) % _MERSENNE_61 for h in hashes) for a, b in MINHASH_COEFFS]
+
+def lsh_buckets(signature: List[int]) -> List[Tuple[int, int]]:
+    rows = MINHASH_PERMS // LSH_BANDS
+    return [
+        (band, int.from_bytes(hashlib.blake2b(json.dumps(signature[band * rows:(band + 1) * rows]).encode(), digest_size=8).digest(), "big", signed=True))
+        for band in range(LSH_BANDS)
+    ]
+
+class ApplicationArchive:
+    """SQLite record of every submission and decision with an FTS5 index over the answers."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._local = threading.local()
+        self._conn().executescript("""
+            CREATE TABLE IF NOT EXISTS applications (
+                id INTEGER PRIMARY KEY,
+                user_id INTEGER NOT NULL,
+                dept TEXT NOT NULL,
+                platform TEXT NOT NULL,
+                subdept TEXT NOT NULL,
+                submitted_at REAL NOT NULL,
+                answers TEXT NOT NULL,
+                decision TEXT,
+                decided_by INTEGER,
+                decided_at REAL,
+                access_at REAL,
+                review_message_id INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS applications_user ON applications (user_id, submitted_at);
+            CREATE INDEX IF NOT EXISTS applications_submitted ON applications (submitted_at);
+            CREATE VIRTUAL TABLE IF NOT EXISTS applications_fts USING fts5(
+                body, content='applications_text', content_rowid='id'
+            );
+            CREATE TABLE IF NOT EXISTS applications_text (id INTEGER PRIMARY KEY, body TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS application_minhash (id INTEGER PRIMARY KEY, signature TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS application_lsh (band INTEGER NOT NULL, bucket INTEGER NOT NULL, id INTEGER NOT NULL);
+            CREATE INDEX IF NOT EXISTS application_lsh_bucket ON application_lsh (band, bucket);
+        """)
+        cols = {row[1] for row in self._conn().execute("PRAGMA table_info(applications)")}
+        for col, kind in (("access_at", "REAL"), ("review_message_id", "INTEGER")):
+            if col not in cols:
+                self._conn().execute(f"ALTER TABLE applications ADD COLUMN {col} {kind}")
+        version = self._conn().execute("PRAGMA user_version").fetchone()[0]
+        if version < 1:
+            self._reindex_answers()
+        if version < 2:
+            self._rebucket_lsh()
+
+    @staticmethod
+    def _fts_body(answers: List[Tuple[str, str]]) -> str:
+        # Answers only — question text is shared by every application in a department
+        return "\n".join(a for _, a in answers)
+
+    def _reindex_answers(self) -> None:
+        """Rebuild the FTS index from answers alone (earlier archives also indexed the questions)."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute("SELECT id, answers FROM applications").fetchall()
+            db.executemany("UPDATE applications_text SET body=? WHERE id=?",
+                           [(self._fts_body(json.loads(answers)), app_id) for app_id, answers in rows])
+            db.execute("INSERT INTO applications_fts (applications_fts) VALUES ('rebuild')")
+            db.execute("PRAGMA user_version=1")
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _rebucket_lsh(self) -> None:
+        """Re-band stored signatures after an LSH_BANDS change (archives before v2 used 16×8)."""
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            rows = db.execute("SELECT id, signature FROM application_minhash").fetchall()
+            db.execute("DELETE FROM application_lsh")
+            db.executemany(
+                "INSERT INTO application_lsh (band, bucket, id) VALUES (?, ?, ?)",
+                [(band, bucket, app_id) for app_id, sig in rows for band, bucket in lsh_buckets(json.loads(sig))],
+            )
+            db.execute("PRAGMA user_version=2")
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+
+    def _conn(self) -> sqlite3.Connection:
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def record_submission(self, record: dict, signature: List[int] | None = None) -> int:
+        body = self._fts_body(record["answers"])
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            cur = db.execute(
+                "INSERT INTO applications (user_id, dept, platform, subdept, submitted_at, answers) VALUES (?, ?, ?, ?, ?, ?)",
+                (record["user_id"], record["dept"], record["platform"], record["subdept"],
+                 record["submitted_at"], json.dumps(record["answers"])),
+            )
+            app_id = cur.lastrowid
+            db.execute("INSERT INTO applications_text (id, body) VALUES (?, ?)", (app_id, body))
+            db.execute("INSERT INTO applications_fts (rowid, body) VALUES (?, ?)", (app_id, body))
+            if signature:
+                db.execute("INSERT INTO application_minhash (id, signature) VALUES (?, ?)", (app_id, json.dumps(signature)))
+                db.executemany(
+                    "INSERT INTO application_lsh (band, bucket, id) VALUES (?, ?, ?)",
+                    [(band, bucket, app_id) for band, bucket in lsh_buckets(signature)],
+                )
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return app_id
+
+    def find_similar(self, signature: List[int], exclude_user: int) -> dict | None:
+        """Most similar archived application from another user that shares an LSH bucket."""
+        buckets = lsh_buckets(signature)
+        rows = self._conn().execute(
+            "SELECT a.id, a.user_id, a.submitted_at, m.signature FROM applications a "
+            "JOIN application_minhash m ON m.id = a.id WHERE a.user_id != ? AND a.id IN ("
+            + " UNION ".join("SELECT id FROM application_lsh WHERE band=? AND bucket=?" for _ in buckets) + ")",
+            (exclude_user, *(v for pair in buckets for v in pair)),
+        ).fetchall()
+        best = None
+        for app_id, user_id, submitted_at, sig in rows:
+            other = json.loads(sig)
+            score = sum(x == y for x, y in zip(signature, other)) / MINHASH_PERMS
+            if best is None or score > best["score"]:
+                best = {"id": app_id, "user_id": user_id, "submitted_at": submitted_at, "score": score}
+        return best
+
+    def record_decision(self, user_id: int, dept: str, decision: str, staff_id: int) -> None:
+        """Stamp the applicant's latest undecided submission for this department."""
+        self._conn().execute(
+            "UPDATE applications SET decision=?, decided_by=?, decided_at=? WHERE id = ("
+            "SELECT id FROM applications WHERE user_id=? AND dept=? AND decision IS NULL "
+            "ORDER BY submitted_at DESC LIMIT 1)",
+            (decision, staff_id, time.time(), user_id, dept),
+        )
+
+    def set_review_message(self, app_id: int, message_id: int) -> None:
+        self._conn().execute("UPDATE applications SET review_message_id=? WHERE id=?", (message_id, app_id))
+
+    def undecided(self, ids: List[int]) -> set[int]:
+        """The subset of ids that still have no decision."""
+        if not ids:
+            return set()
+        rows = self._conn().execute(
+            f"SELECT id FROM applications WHERE decision IS NULL AND id IN ({','.join('?' * len(ids))})", ids
+        ).fetchall()
+        return {row[0] for row in rows}
+
+    def pending(self, limit: int = 25) -> List[dict]:
+        """Oldest undecided submissions — the review backlog."""
+        rows = self._conn().execute(
+            "SELECT id, user_id, dept, platform, subdept, submitted_at, review_message_id FROM applications "
+            "WHERE decision IS NULL ORDER BY submitted_at LIMIT ?", (limit,)
+        ).fetchall()
+        keys = ("id", "user_id", "dept", "platform", "subdept", "submitted_at", "review_message_id")
+        return [dict(zip(keys, row)) for row in rows]
+
+    def mark_access(self, user_id: int, dept: str) -> float | None:
+        """Stamp guild access on the latest accepted submission; returns its submitted_at."""
+        db = self._conn()
+        row = db.execute(
+            "SELECT id, submitted_at FROM applications WHERE user_id=? AND dept=? AND decision='Accepted' "
+            "AND access_at IS NULL ORDER BY submitted_at DESC LIMIT 1",
+            (user_id, dept),
+        ).fetchone()
+        if not row:
+            return None
+        db.execute("UPDATE applications SET access_at=? WHERE id=?", (time.time(), row[0]))
+        return row[1]
+
+    def search(self, *, user_id: int | None = None, dept: str | None = None, platform: str | None = None,
+               since: float | None = None, until: float | None = None, text: str | None = None,
+               limit: int = ARCHIVE_PAGE_SIZE, offset: int = 0) -> Tuple[List[dict], int]:
+        """Return (one page of matches, newest first; total match count)."""
+        where, args = [], []
+        for col, val in (("a.user_id", user_id), ("a.dept", dept), ("a.platform", platform)):
+            if val is not None:
+                where.append(f"{col} = ?")
+                args.append(val)
+        if since is not None:
+            where.append("a.submitted_at >= ?")
+            args.append(since)
+        if until is not None:
+            where.append("a.submitted_at < ?")
+            args.append(until)
+        src, snippet = "applications a", "NULL"
+        if text:
+            # Word tokens only (quoted, prefix match) so user input can't break FTS5 query syntax
+            terms = re.findall(r"\w+", text)
+            if not terms:
+                return [], 0
+            src = "applications_fts f JOIN applications a ON a.id = f.rowid"
+            snippet = "snippet(applications_fts, 0, '**', '**', '…', 16)"
+            where.append("applications_fts MATCH ?")
+            args.append(" ".join(f'"{t}"*' for t in terms))
+        clause = f" WHERE {' AND '.join(where)}" if where else ""
+        db = self._conn()
+        total = db.execute(f"SELECT COUNT(*) FROM {src}{clause}", args).fetchone()[0]
+        rows = db.execute(
+            f"SELECT a.id, a.user_id, a.dept, a.platform, a.subdept, a.submitted_at, a.decision, a.decided_by, {snippet} "
+            f"FROM {src}{clause} ORDER BY a.submitted_at DESC LIMIT ? OFFSET ?",
+            (*args, limit, offset),
+        ).fetchall()
+        keys = ("id", "user_id", "dept", "platform", "subdept", "submitted_at", "decision", "decided_by", "snippet")
+        return [dict(zip(keys, row)) for row in rows], total
+
+app_archive = ApplicationArchive(ARCHIVE_PATH)
 
 # =====================================================
 # Utility Helpers / Core Logic
 # =====================================================
 
+# -------------------------
+# Metrics Registry (Prometheus text format, served at /metrics)
+# -------------------------
+# Hot paths only bump a counter or a histogram bucket; everything that already has
+# its own stats dict is read at scrape time instead.
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+ANSWER_BUCKETS  = (5, 15, 30, 60, 120, 180, 240, 300)
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+
+metrics_lock = threading.Lock()  # Flask threads record metrics too
+metric_counters: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], float] = {}
+metric_histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+METRIC_HELP = {
+    "grn_applications_total": ("counter", "Finished application flows by outcome."),
+    "grn_answer_latency_seconds": ("histogram", "Time from a question being shown to the applicant's answer."),
+    "grn_oauth_stage_seconds": ("histogram", "Verification stage latencies (token, identify, join, verify, hq_swap, dept_roles)."),
+    "grn_http_responses_total": ("counter", "Auth web server responses by path and status."),
+    "grn_discord_429_total": ("counter", "Discord 429 responses seen outside discord.py's own limiter."),
+    "grn_outbound_delay_seconds": ("histogram", "Queueing delay in the outbound message scheduler."),
+}
+
+def inc(name: str, amount: float = 1, **labels: str):
+    key = (name, tuple(sorted(labels.items())))
+    with metrics_lock:
+        metric_counters[key] = metric_counters.get(key, 0) + amount
+
+def observe(name: str, value: float, buckets: Tuple[float, ...] = LATENCY_BUCKETS, **labels: str):
+    key = (name, tuple(sorted(labels.items())))
+    with metrics_lock:
+        hist = metric_histograms.get(key)
+        if hist is None:
+            hist = metric_histograms[key] = Histogram(buckets)
+        hist.observe(value)
+
 # -------------------------
 # Helper Functions
 # -------------------------
@@ -166,10 +920,224 @@ def dept_color(dept: str) -> discord.Color:
         return discord.Color.from_rgb(255, 140, 100)
     return GRN_COLOR
 
-def readable_remaining(deadline: float) -> str:
-    left = max(0, int(deadline - time.time()))
-    m, s = divmod(left, 60)
-    return f"{m}m {s}s"
+def readable_duration(seconds: float) -> str:
+    m, s = divmod(int(seconds), 60)
+    h, m = divmod(m, 60)
+    return f"{h}h {m}m" if h else f"{m}m {s}s"
+
+# -------------------------
+# Outbound Message Scheduler
+# -------------------------
+# Interaction responses bypass this entirely: they ride the interaction token, not the bot's
+# global limit, and must land within 3s — so they always rank above every class here.
+OUT_AUTH, OUT_QUESTION, OUT_DECISION, OUT_LOG = range(4)  # dispatch priority, highest first
+OUTBOUND_CLASS_NAMES = {OUT_AUTH: "auth", OUT_QUESTION: "question", OUT_DECISION: "decision", OUT_LOG: "log"}
+OUTBOUND_WORKERS = 4
+OUTBOUND_CLASS_LIMITS = {OUT_LOG: 1}  # max sends in flight for a class
+
+# class → recipient key → pending sends; dict order doubles as the round-robin ring
+outbound_lanes: Dict[int, Dict[int, deque]] = {cls: {} for cls in OUTBOUND_CLASS_NAMES}
+outbound_inflight: Dict[int, int] = {cls: 0 for cls in OUTBOUND_CLASS_NAMES}
+outbound_wakeup = asyncio.Event()
+outbound_stats = {
+    cls: {"sent": 0, "failed": 0, "total_delay_s": 0.0, "last_delay_s": 0.0, "max_delay_s": 0.0}
+    for cls in OUTBOUND_CLASS_NAMES
+}
+
+def _next_outbound():
+    """Highest-priority class with room, then the next recipient in that class's ring."""
+    for cls, lanes in outbound_lanes.items():
+        if not lanes or outbound_inflight[cls] >= OUTBOUND_CLASS_LIMITS.get(cls, OUTBOUND_WORKERS):
+            continue
+        key = next(iter(lanes))
+        lane = lanes.pop(key)
+        job = lane.popleft()
+        if lane:
+            lanes[key] = lane  # back of the ring
+        return cls, job
+    return None
+
+async def outbound_worker():
+    while True:
+        picked = _next_outbound()
+        if picked is None:
+            outbound_wakeup.clear()
+            await outbound_wakeup.wait()
+            continue
+        cls, (factory, fut, enqueued_at) = picked
+        stats = outbound_stats[cls]
+        delay = time.perf_counter() - enqueued_at
+        stats["total_delay_s"] += delay
+        stats["last_delay_s"] = delay
+        stats["max_delay_s"] = max(stats["max_delay_s"], delay)
+        observe("grn_outbound_delay_seconds", delay, cls=OUTBOUND_CLASS_NAMES[cls])
+        outbound_inflight[cls] += 1
+        try:
+            result = await factory()
+            stats["sent"] += 1
+            if not fut.done():
+                fut.set_result(result)
+        except Exception as e:
+            stats["failed"] += 1
+            if not fut.done():
+                fut.set_exception(e)
+        finally:
+            outbound_inflight[cls] -= 1
+            outbound_wakeup.set()  # a class slot may have opened up
+
+async def send_outbound(cls: int, key: int, factory):
+    """Queue `factory()` (a message send) in its priority class and wait for the result."""
+    for i in range(OUTBOUND_WORKERS):
+        start_background_task(f"outbound:{i}", outbound_worker)
+    fut = asyncio.get_running_loop().create_future()
+    outbound_lanes[cls].setdefault(key, deque()).append((factory, fut, time.perf_counter()))
+    outbound_wakeup.set()
+    return await fut
+
+def outbound_metrics() -> dict:
+    out = {}
+    for cls, name in OUTBOUND_CLASS_NAMES.items():
+        s = outbound_stats[cls]
+        done = s["sent"] + s["failed"]
+        out[name] = {
+            "queued": sum(len(lane) for lane in outbound_lanes[cls].values()),
+            "inflight": outbound_inflight[cls],
+            "avg_delay_s": s["total_delay_s"] / done if done else 0.0,
+            **s,
+        }
+    return out
+
+# -------------------------
+# Staff Log Sink
+# -------------------------
+LOG_ERROR, LOG_AUDIT, LOG_INFO = 0, 1, 2  # lower = more important; LOG_INFO is dropped first
+
+log_buffers: Dict[int, Dict[str, dict]] = {}  # channel id → coalesce key → entry (insertion ordered)
+log_lock = threading.Lock()                   # log_event is called from Flask threads too
+log_wakeup = asyncio.Event()
+log_sink_stats = {"queued": 0, "coalesced": 0, "dropped": 0, "sent": 0, "messages": 0, "failed": 0}
+
+def log_event(channel_id: int, text: str | None = None, *, embed: Embed | None = None,
+              priority: int = LOG_INFO, key: str | None = None) -> None:
+    """Buffer a staff log entry; identical text entries coalesce into one line with a count."""
+    if not BOT_IN_PROCESS:
+        # Web-only worker (gunicorn, WEB_SERVER_MODE=none): no bot loop will ever run the sink
+        threading.Thread(target=_post_log_direct, args=(channel_id, text, embed), daemon=True).start()
+        return
+    key = key or (text if embed is None else f"embed:{id(embed)}")
+    with log_lock:
+        buf = log_buffers.setdefault(channel_id, {})
+        if key in buf:
+            buf[key]["count"] += 1
+            log_sink_stats["coalesced"] += 1
+            return
+        if sum(len(b) for b in log_buffers.values()) >= LOG_BUFFER_MAX and not _drop_log_entry(priority):
+            log_sink_stats["dropped"] += 1
+            return
+        buf[key] = {"text": text, "embed": embed, "priority": priority, "count": 1, "at": time.time()}
+        log_sink_stats["queued"] += 1
+        full = len(buf) >= 10
+    if full or priority == LOG_ERROR and len(buf) == 1:
+        _wake_log_sink()
+
+def _drop_log_entry(incoming_priority: int) -> bool:
+    """Evict the oldest least-important entry to make room; False if the incoming entry should go instead."""
+    victim = None
+    for ch_id, buf in log_buffers.items():
+        for k, e in buf.items():
+            if e["priority"] > incoming_priority and (victim is None or e["priority"] > victim[2]):
+                victim = (ch_id, k, e["priority"])
+    if victim is None:
+        return False
+    del log_buffers[victim[0]][victim[1]]
+    log_sink_stats["dropped"] += 1
+    return True
+
+def _wake_log_sink():
+    try:
+        asyncio.get_running_loop()
+        log_wakeup.set()
+        return
+    except RuntimeError:
+        pass
+    try:
+        if bot.loop.is_running():
+            bot.loop.call_soon_threadsafe(log_wakeup.set)
+    except AttributeError:
+        pass  # client not started yet (discord.py's loop sentinel) — the first flush picks it up
+
+def _post_log_direct(channel_id: int, text: str | None, embed: Embed | None):
+    """Unbatched fallback for processes without the sink: one REST post per entry."""
+    payload = {"embeds": [embed.to_dict()]} if embed is not None else {"content": (text or "")[:2000]}
+    try:
+        if url := LOG_WEBHOOKS.get(channel_id):
+            resp = discord_rest.session.post(url, json={**payload, "username": "GRN Logs"}, timeout=discord_rest.timeout)
+        else:
+            resp = discord_rest.request(
+                "POST", "/channels/{channel_id}/messages",
+                params={"channel_id": channel_id},
+                headers={"Authorization": f"Bot {BOT_TOKEN}"},
+                json=payload,
+            )
+        resp.raise_for_status()
+        log_sink_stats["sent"] += 1
+    except Exception as e:
+        log_sink_stats["failed"] += 1
+        print(f"log delivery error ({e}) — {text if embed is None else embed.title}")
+
+def _pack_log_messages(entries: List[dict]) -> List[List[Embed]]:
+    """Text entries become embed descriptions; pack ≤10 embeds / ~5500 chars per message."""
+    embeds: List[Embed] = []
+    lines = ""
+    for e in entries:
+        if e["embed"] is not None:
+            embeds.append(e["embed"])
+            continue
+        line = e["text"] + (f" **×{e['count']}**" if e["count"] > 1 else "")
+        if lines and len(lines) + len(line) + 1 > 3900:
+            embeds.append(Embed(description=lines, color=GRN_COLOR))
+            lines = ""
+        lines += line[:3900] + "\n"
+    if lines:
+        embeds.append(Embed(description=lines, color=GRN_COLOR))
+
+    messages: List[List[Embed]] = []
+    for embed in embeds:
+        if not messages or len(messages[-1]) >= 10 or sum(map(len, messages[-1])) + len(embed) > 5500:
+            messages.append([])
+        messages[-1].append(embed)
+    return messages
+
+async def _deliver_log(channel_id: int, embeds: List[Embed]):
+    if url := LOG_WEBHOOKS.get(channel_id):
+        await discord.Webhook.from_url(url, client=bot).send(embeds=embeds, username="GRN Logs")
+    elif ch := bot.get_channel(channel_id):
+        await send_outbound(OUT_LOG, channel_id, lambda: ch.send(embeds=embeds))
+
+async def flush_logs():
+    with log_lock:
+        batches = {ch_id: list(buf.values()) for ch_id, buf in log_buffers.items() if buf}
+        log_buffers.clear()
+    for ch_id, entries in batches.items():
+        entries.sort(key=lambda e: (e["priority"], e["at"]))
+        for embeds in _pack_log_messages(entries):
+            try:
+                await _deliver_log(ch_id, embeds)
+                log_sink_stats["messages"] += 1
+                log_sink_stats["sent"] += len(embeds)
+            except Exception as e:
+                log_sink_stats["failed"] += 1
+                print("log sink delivery error:", e)
+
+async def log_sink_flusher():
+    """Flush buffered staff logs every LOG_FLUSH_SECONDS, or sooner when a batch fills."""
+    while True:
+        try:
+            await asyncio.wait_for(log_wakeup.wait(), LOG_FLUSH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        log_wakeup.clear()
+        await flush_logs()
 
 async def report_interaction_error(interaction: discord.Interaction | None, err: Exception, prefix: str):
     """Graceful error reporting."""
@@ -183,12 +1151,70 @@ async def report_interaction_error(interaction: discord.Interaction | None, err:
                 await interaction.response.send_message(msg, ephemeral=True)
     except Exception:
         pass
-    try:
-        ch = bot.get_channel(AUTH_CODE_LOG_CHANNEL)
-        if ch:
-            await ch.send(f"**{prefix}**\n```py\n{repr(err)}\n```")
-    except Exception:
-        pass
+    log_event(AUTH_CODE_LOG_CHANNEL, f"**{prefix}**\n```py\n{repr(err)[:1500]}\n```", priority=LOG_ERROR)
+
+# -------------------------
+# Application Task Registry
+# -------------------------
+application_tasks: Dict[int, asyncio.Task] = {}  # user_id → running application flow
+
+def application_in_progress(user_id: int) -> bool:
+    task = application_tasks.get(user_id)
+    return task is not None and not task.done()
+
+def start_application_task(user_id: int, coro) -> asyncio.Task | None:
+    """Run an application flow in the background (one per user)."""
+    if application_in_progress(user_id):
+        coro.close()
+        return None
+    task = asyncio.create_task(coro, name=f"application-{user_id}")
+    application_tasks[user_id] = task
+    task.add_done_callback(lambda t: _application_task_done(user_id, t))
+    return task
+
+def _application_task_done(user_id: int, task: asyncio.Task):
+    # A newer flow may already own this slot — leave its session alone
+    if application_tasks.get(user_id) is not task:
+        return
+    application_tasks.pop(user_id, None)
+    if started := app_sessions.get(user_id, {}).get("started_at"):
+        application_durations.append(time.time() - started)
+    drop_session(user_id)
+    promote_waiting()
+    if task.cancelled():
+        inc("grn_applications_total", outcome="cancelled")
+    elif err := task.exception():
+        inc("grn_applications_total", outcome="error")
+        asyncio.create_task(report_interaction_error(None, err, f"Application task for {user_id} crashed"))
+
+def cancel_application_task(user_id: int) -> bool:
+    task = application_tasks.get(user_id)
+    if task is None or task.done():
+        return False
+    task.cancel()
+    return True
+
+def active_application_count() -> int:
+    return sum(1 for task in application_tasks.values() if not task.done())
+
+def list_application_tasks() -> List[Tuple[int, float]]:
+    """(user_id, started_at) for every running application, oldest first."""
+    running = [
+        (uid, app_sessions.get(uid, {}).get("started_at", 0.0))
+        for uid, task in application_tasks.items() if not task.done()
+    ]
+    return sorted(running, key=lambda r: r[1])
+
+# -------------------------
+# Background Services (started once, survive reconnects)
+# -------------------------
+background_tasks: Dict[str, asyncio.Task] = {}
+
+def start_background_task(name: str, factory) -> None:
+    """Start `factory()` unless a task with this name is still running."""
+    task = background_tasks.get(name)
+    if task is None or task.done():
+        background_tasks[name] = asyncio.create_task(factory(), name=name)
 
 # =====================================================
 # Panel UI Elements
@@ -231,6 +1257,7 @@ class PlatformSelect(discord.ui.Select):
         if not sess or interaction.user.id != self.user_id:
             return await interaction.response.send_message("This selector isn’t for you.", ephemeral=True)
         sess["platform"] = self.values[0]
+        save_session(self.user_id)
         await interaction.response.edit_message(view=None)
         self.view.stop()
 
@@ -269,6 +1296,7 @@ class SubdeptSelect(discord.ui.Select):
         if not sess or interaction.user.id != self.user_id:
             return await interaction.response.send_message("This selector isn’t for you.", ephemeral=True)
         sess["subdept"] = self.values[0]
+        save_session(self.user_id)
         await interaction.response.edit_message(view=None)
         self.view.stop()
 
@@ -277,6 +1305,108 @@ class SubdeptSelectView(SafeView):
         super().__init__(timeout=timeout)
         self.add_item(SubdeptSelect(user_id))
 
+# -------------------------
+# Admission Control (waiting line in front of the DM flow)
+# -------------------------
+# FIFO of users waiting for a free application slot; dict order is arrival order.
+admission_queue: Dict[int, dict] = {}
+application_durations: deque = deque(maxlen=50)  # recent start → finish times, for the ETA
+admission_stats = {"admitted": 0, "queued_total": 0, "max_queue": 0, "left_queue": 0,
+                   "last_wait_s": 0.0, "max_wait_s": 0.0, "total_wait_s": 0.0}
+
+def open_application(interaction: discord.Interaction, user: discord.abc.User, dept: str) -> bool:
+    """Create the session and start the DM flow (the 35-minute clock starts here).
+
+    Returns False — leaving the live session untouched — if the user already has a flow running.
+    """
+    if application_in_progress(user.id):
+        return False
+    app_sessions[user.id] = {
+        "dept": dept,
+        "guild_id": interaction.guild.id if interaction.guild else None,
+        "answers": [],
+        "started_at": time.time(),
+        "deadline": time.time() + APP_TOTAL_TIME_SECONDS,
+        "platform": None,
+        "subdept": "N/A",
+    }
+    save_session(user.id)
+    start_application_task(user.id, run_application_flow(interaction, user, dept))
+    admission_stats["admitted"] += 1
+    return True
+
+def has_free_slot() -> bool:
+    return not MAX_ACTIVE_APPLICATIONS or active_application_count() < MAX_ACTIVE_APPLICATIONS
+
+def queue_position(user_id: int) -> int:
+    return list(admission_queue).index(user_id) + 1
+
+def estimated_wait(position: int) -> float:
+    avg = sum(application_durations) / len(application_durations) if application_durations else ADMISSION_DEFAULT_APP_SECONDS
+    return position * avg / max(1, MAX_ACTIVE_APPLICATIONS)
+
+def queue_message(position: int) -> str:
+    return (
+        f"🕒 Applications are busy right now — you are **#{position}** in line "
+        f"(estimated wait **~{readable_duration(estimated_wait(position))}**).\n"
+        "Keep this open; I’ll DM you as soon as it’s your turn."
+    )
+
+def enqueue_applicant(interaction: discord.Interaction, user: discord.abc.User, dept: str) -> int:
+    admission_queue[user.id] = {
+        "interaction": interaction, "dept": dept,
+        "enqueued_at": time.time(), "shown_position": None,
+    }
+    admission_stats["queued_total"] += 1
+    admission_stats["max_queue"] = max(admission_stats["max_queue"], len(admission_queue))
+    return len(admission_queue)
+
+def promote_waiting():
+    """Admit queued users, oldest first, while slots are free."""
+    while admission_queue and has_free_slot():
+        user_id = next(iter(admission_queue))
+        entry = admission_queue.pop(user_id)
+        waited = time.time() - entry["enqueued_at"]
+        admission_stats["last_wait_s"] = waited
+        admission_stats["max_wait_s"] = max(admission_stats["max_wait_s"], waited)
+        admission_stats["total_wait_s"] += waited
+        interaction = entry["interaction"]
+        if not open_application(interaction, interaction.user, entry["dept"]):
+            continue
+        asyncio.create_task(_edit_queue_note(interaction, "📬 It’s your turn — I’ve sent you a DM to continue your application."))
+
+async def _edit_queue_note(interaction: discord.Interaction, content: str):
+    # Interaction tokens expire after 15 minutes; the user keeps their place regardless
+    if time.time() - interaction.created_at.timestamp() > 14 * 60:
+        return
+    try:
+        await interaction.edit_original_response(content=content)
+    except discord.HTTPException:
+        pass
+
+async def admission_updater():
+    """Refresh each queued user's position note when it changes, and promote as slots free."""
+    while True:
+        await asyncio.sleep(ADMISSION_UPDATE_SECONDS)
+        try:
+            promote_waiting()
+            for position, entry in enumerate(list(admission_queue.values()), start=1):
+                if entry["shown_position"] != position:
+                    entry["shown_position"] = position
+                    await _edit_queue_note(entry["interaction"], queue_message(position))
+        except Exception as e:
+            print("admission updater error:", e)
+
+def admission_metrics() -> dict:
+    admitted_from_queue = admission_stats["queued_total"] - len(admission_queue) - admission_stats["left_queue"]
+    return {
+        "active": active_application_count(),
+        "cap": MAX_ACTIVE_APPLICATIONS,
+        "queue_length": len(admission_queue),
+        "avg_wait_s": admission_stats["total_wait_s"] / admitted_from_queue if admitted_from_queue > 0 else 0.0,
+        **admission_stats,
+    }
+
 # -------------------------
 # Department Dropdown (Menu at Panel)
 # -------------------------
@@ -304,86 +1434,32 @@ class DepartmentSelect(discord.ui.Select):
 
     async def callback(self, interaction: discord.Interaction):
         try:
-            await interaction.response.defer(ephemeral=True)
-            dept = self.values[0]
             user = interaction.user
-            app_sessions[user.id] = {
-                "dept": dept,
-                "guild_id": interaction.guild.id if interaction.guild else None,
-                "answers": [],
-                "started_at": time.time(),
-                "deadline": time.time() + APP_TOTAL_TIME_SECONDS,
-                "platform": None,
-                "subdept": "N/A",
-            }
-            color = dept_color(dept)
-            dm = await user.create_dm()
-
-            intro = Embed(
-                title="📋 Grant Roleplay Network™ — Application",
-                description=f"Department selected: **{dept}**\n\nBefore we start, please confirm a few details below.",
-                color=color
-            ).set_footer(text=FOOTER_TEXT)
-            await dm.send(embed=intro)
-
-            # Platform select
-            plat_embed = Embed(
-                title="Select Platform",
-                description="Choose your **platform** below.",
-                color=color
-            ).set_footer(text=FOOTER_TEXT)
-            plat_view = PlatformSelectView(user.id)
-            plat_msg = await dm.send(embed=plat_embed, view=plat_view)
-            plat_timeout = await plat_view.wait()
-            if plat_timeout or not app_sessions[user.id].get("platform"):
-                await dm.send("⏳ Selector timed out. Please select from the panel again.")
-                app_sessions.pop(user.id, None)
-                return
-            await plat_msg.edit(embed=Embed(
-                title="Select Platform",
-                description=f"✅ **Platform selected:** `{app_sessions[user.id]['platform']}`",
-                color=discord.Color.green()
-            ).set_footer(text=FOOTER_TEXT), view=None)
-
-            # PSO sub-dept if needed
-            if dept == "PSO":
-                sub_embed = Embed(
-                    title="Select PSO Sub-Department",
-                    description="Choose your **PSO Sub-Department** below.",
-                    color=color
-                ).set_footer(text=FOOTER_TEXT)
-                sub_view = SubdeptSelectView(user.id)
-                sub_msg = await dm.send(embed=sub_embed, view=sub_view)
-                sub_timeout = await sub_view.wait()
-                if sub_timeout or not app_sessions[user.id].get("subdept") or app_sessions[user.id]["subdept"] == "N/A":
-                    await dm.send("⏳ Selector timed out. Please select from the panel again.")
-                    app_sessions.pop(user.id, None)
-                    return
-                await sub_msg.edit(embed=Embed(
-                    title="Select PSO Sub-Department",
-                    description=f"✅ **Sub-Department selected:** `{app_sessions[user.id]['subdept']}`",
-                    color=discord.Color.green()
-                ).set_footer(text=FOOTER_TEXT), view=None)
-
-            sess = app_sessions[user.id]
-            confirm = Embed(
-                title="✅ Application Details Confirmed",
-                description="Selections saved. I’ll now begin your application questions.",
-                color=color
-            )
-            confirm.add_field(name="Department", value=sess["dept"], inline=False)
-            confirm.add_field(name="Sub-Department", value=sess.get("subdept","N/A"), inline=False)
-            confirm.add_field(name="Platform", value=sess.get("platform","N/A"), inline=False)
-            confirm.set_footer(text=f"{FOOTER_TEXT} | Time left: {readable_remaining(sess['deadline'])}")
-            await dm.send(embed=confirm)
-
-            await run_questions(user)
-            await interaction.followup.send("📬 I’ve sent you a DM to continue your application.", ephemeral=True)
-
-        except discord.Forbidden:
-            msg="⚠️ I couldn’t DM you. Please enable DMs and select again."
-            if interaction.response.is_done(): await interaction.followup.send(msg, ephemeral=True)
-            else: await interaction.response.send_message(msg, ephemeral=True)
+            # The only await comes first: from the single-flight check to open_application
+            # nothing may yield, or a double-click on two departments gets through twice
+            if until := await reapply_blocked_until(user.id):
+                return await interaction.response.send_message(
+                    f"⛔ Your last application was denied — you can reapply <t:{int(until)}:R>.", ephemeral=True
+                )
+            if application_in_progress(user.id):
+                return await interaction.response.send_message(
+                    "⏳ You already have an application in progress — check your DMs.", ephemeral=True
+                )
+            dept = self.values[0]
+            if user.id in admission_queue:
+                # Re-selecting keeps their place (and picks up a fresh interaction token for updates)
+                entry = admission_queue[user.id]
+                entry.update(interaction=interaction, dept=dept, shown_position=queue_position(user.id))
+                return await interaction.response.send_message(queue_message(entry["shown_position"]), ephemeral=True)
+            if admission_queue or not has_free_slot():
+                position = enqueue_applicant(interaction, user, dept)
+                admission_queue[user.id]["shown_position"] = position
+                return await interaction.response.send_message(queue_message(position), ephemeral=True)
+            if not open_application(interaction, user, dept):
+                return await interaction.response.send_message(
+                    "⏳ You already have an application in progress — check your DMs.", ephemeral=True
+                )
+            await interaction.response.send_message("📬 I’ve sent you a DM to continue your application.", ephemeral=True)
         except Exception as e:
             await report_interaction_error(interaction, e, "DepartmentSelect callback failed")
 
@@ -392,6 +1468,141 @@ class ApplicationPanel(discord.ui.View):
         super().__init__(timeout=None)
         self.add_item(DepartmentSelect())
 
+# -------------------------
+# Application Wizard (one DM message, edited in place)
+# -------------------------
+WIZARD_REFRESH_SECONDS = 60  # coarsest gap between progress refreshes while answering
+
+def progress_bar(done: int, total: int, width: int = 10) -> str:
+    filled = round(width * done / total) if total else width
+    return "▰" * filled + "▱" * (width - filled) + f" {done}/{total}"
+
+def wizard_embed(user_id: int, step: str, body: str, *, color: discord.Color | None = None) -> Embed:
+    """The applicant's single status message: current step, selections, progress and a live countdown."""
+    sess = app_sessions.get(user_id, {})
+    dept = sess.get("dept", "N/A")
+    e = Embed(title="📋 Grant Roleplay Network™ — Application", description=body, color=color or dept_color(dept))
+    e.add_field(name="Step", value=step, inline=True)
+    e.add_field(name="Details", value=f"`{dept}` · `{sess.get('subdept') or 'N/A'}` · `{sess.get('platform') or '—'}`", inline=True)
+    e.add_field(name="Progress", value=progress_bar(len(sess.get("answers", [])), len(DEPT_QUESTIONS.get(dept, []))), inline=False)
+    if deadline := sess.get("deadline"):
+        e.add_field(name="Time Left", value=f"Ends <t:{int(deadline)}:R>", inline=False)  # Discord renders this live
+    return e.set_footer(text=FOOTER_TEXT)
+
+async def edit_wizard(user: discord.abc.User, step: str, body: str, **kwargs) -> bool:
+    """Edit the wizard message in place (False if there isn't one or it's gone)."""
+    sess = app_sessions.get(user.id)
+    if not sess or not sess.get("wizard_msg_id"):
+        return False
+    view = kwargs.pop("view", None)
+    try:
+        dm = user.dm_channel or await user.create_dm()
+        await dm.get_partial_message(sess["wizard_msg_id"]).edit(embed=wizard_embed(user.id, step, body, **kwargs), view=view)
+        sess["wizard_refreshed_at"] = time.time()
+        return True
+    except discord.HTTPException:
+        return False
+
+async def run_application_flow(interaction: discord.Interaction, user: discord.abc.User, dept: str):
+    """Setup selectors + questions for one applicant; owned by the task registry."""
+    try:
+        dm = await user.create_dm()
+        timed_out = "⏳ Selector timed out. Please select from the panel again."
+
+        # Platform select — this message becomes the wizard for the rest of the application
+        plat_view = PlatformSelectView(user.id)
+        wizard = await dm.send(
+            embed=wizard_embed(user.id, "1 · Platform", f"Department selected: **{dept}**\n\nChoose your **platform** below."),
+            view=plat_view,
+        )
+        app_sessions[user.id]["wizard_msg_id"] = wizard.id
+        save_session(user.id)
+        plat_timeout = await plat_view.wait()
+        if plat_timeout or not app_sessions[user.id].get("platform"):
+            await edit_wizard(user, "Timed out", timed_out, color=discord.Color.orange())
+            inc("grn_applications_total", outcome="selector_timeout")
+            drop_session(user.id)
+            return
+
+        # PSO sub-dept if needed
+        if dept == "PSO":
+            sub_view = SubdeptSelectView(user.id)
+            await edit_wizard(user, "2 · Sub-Department", "Choose your **PSO Sub-Department** below.", view=sub_view)
+            sub_timeout = await sub_view.wait()
+            if sub_timeout or not app_sessions[user.id].get("subdept") or app_sessions[user.id]["subdept"] == "N/A":
+                await edit_wizard(user, "Timed out", timed_out, color=discord.Color.orange())
+                inc("grn_applications_total", outcome="selector_timeout")
+                drop_session(user.id)
+                return
+
+        await edit_wizard(
+            user, "Questions",
+            "✅ **Details confirmed.** Your questions follow below — reply to each one here in DMs.",
+        )
+        await run_questions(user)
+
+    except discord.Forbidden:
+        try:
+            await interaction.followup.send("⚠️ I couldn’t DM you. Please enable DMs and select again.", ephemeral=True)
+        except Exception:
+            pass
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await report_interaction_error(interaction, e, "Application flow failed")
+
+# -------------------------
+# Checkpoint Resume (after restarts)
+# -------------------------
+async def resume_application_flow(user_id: int):
+    """Continue a restored session from its next unanswered question."""
+    sess = app_sessions.get(user_id)
+    if not sess:
+        return
+    try:
+        user = await bot.fetch_user(user_id)
+        answered = len(sess["answers"])
+        await user.send(embed=Embed(
+            title="🔄 Application Resumed",
+            description=(
+                "The application system restarted, but your progress was saved.\n\n"
+                f"**Answered so far:** {answered}/{len(DEPT_QUESTIONS[sess['dept']])}\n"
+                f"_Ends <t:{int(sess['deadline'])}:R>_"
+            ),
+            color=dept_color(sess["dept"])
+        ).set_footer(text=FOOTER_TEXT))
+        await run_questions(user)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        await report_interaction_error(None, e, f"Resume failed for {user_id}")
+
+async def resume_checkpointed_applications():
+    """Reload checkpoints and restart each unfinished application."""
+    rows = await asyncio.to_thread(checkpoint_store.items, "app_checkpoints")
+    resumed = 0
+    for key, sess in rows:
+        user_id = int(key)
+        if application_in_progress(user_id):
+            continue
+        if time.time() >= sess.get("deadline", 0) or not sess.get("platform") or (
+            sess.get("dept") == "PSO" and sess.get("subdept") in (None, "N/A")
+        ):
+            # Expired, or still in the selector stage — nothing sensible to resume
+            await asyncio.to_thread(checkpoint_store.delete, "app_checkpoints", user_id)
+            try:
+                user = await bot.fetch_user(user_id)
+                await user.send("⏳ Your application was interrupted by a restart. Please start again from the panel.")
+            except Exception:
+                pass
+            continue
+        sess["answers"] = [tuple(a) for a in sess.get("answers", [])]
+        app_sessions[user_id] = sess
+        start_application_task(user_id, resume_application_flow(user_id))
+        resumed += 1
+    if resumed:
+        print(f"[🔄] Resumed {resumed} in-flight application(s) from checkpoints")
+
 # -------------------------
 # Application Panel Embed (Front Panel)
 # -------------------------
@@ -509,6 +1720,30 @@ DEPT_QUESTIONS = {
     "SAFR": COMMON_4 + SAFR_SPECIFIC_16,
 }
 
+# -------------------------
+# Answer Routing (DM → applicant queue)
+# -------------------------
+answer_queues: Dict[int, asyncio.Queue] = {}  # user_id → queue of DM answers
+
+def open_answer_queue(user_id: int) -> asyncio.Queue:
+    """Register (or reuse) the answer queue for an applicant."""
+    q = answer_queues.get(user_id)
+    if q is None:
+        q = answer_queues[user_id] = asyncio.Queue()
+    return q
+
+def close_answer_queue(user_id: int):
+    answer_queues.pop(user_id, None)
+
+@bot.listen("on_message")
+async def route_application_answer(message: discord.Message):
+    """Single dispatcher for every gateway message — O(1) per message."""
+    if message.guild is not None or message.author.bot:
+        return
+    q = answer_queues.get(message.author.id)
+    if q is not None:
+        q.put_nowait(message)
+
 # -------------------------
 # DM Question Flow
 # -------------------------
@@ -518,277 +1753,844 @@ async def run_questions(user: discord.User):
         return
 
     dept = sess["dept"]
+    if dept in MODAL_MODE_DEPTS:
+        return await run_questions_modal(user)
+
     questions = DEPT_QUESTIONS[dept]
     deadline = sess["deadline"]
     color = dept_color(dept)
     dm = await user.create_dm()
 
-    for qkey, qtext in questions:
-        if time.time() > deadline:
-            await dm.send(embed=Embed(
-                title="⏳ Time Expired",
-                description="Your application time has expired (35 minutes). Please start again from the panel.",
-                color=discord.Color.orange()
-            ).set_footer(text=FOOTER_TEXT))
-            return
+    answers = open_answer_queue(user.id)
+    try:
+        # Resume after the last answered question (checkpoint restore)
+        for qkey, qtext in questions[len(sess["answers"]):]:
+            if time.time() > deadline:
+                await send_outbound(OUT_QUESTION, user.id, lambda: dm.send(embed=Embed(
+                    title="⏳ Time Expired",
+                    description="Your application time has expired (35 minutes). Please start again from the panel.",
+                    color=discord.Color.orange()
+                ).set_footer(text=FOOTER_TEXT)))
+                inc("grn_applications_total", outcome="timeout")
+                return
+
+            e = Embed(
+                title=qkey,
+                description=f"{qtext}\n\n{progress_bar(len(sess['answers']), len(questions))} · ends <t:{int(deadline)}:R>",
+                color=color,
+            )
+            e.set_footer(text=FOOTER_TEXT)
+            # Drop anything typed before this question was shown
+            while not answers.empty():
+                answers.get_nowait()
+            await send_outbound(OUT_QUESTION, user.id, lambda: dm.send(embed=e))
+            asked_at = time.perf_counter()
+
+            try:
+                remaining = max(1, int(deadline - time.time()))
+                timeout = min(remaining, 300)  # 5 minutes per question max
+                msg = await asyncio.wait_for(answers.get(), timeout=timeout)
+                observe("grn_answer_latency_seconds", time.perf_counter() - asked_at, ANSWER_BUCKETS, dept=dept)
+                sess["answers"].append((qtext, msg.content.strip()))
+                save_session(user.id)
+                if time.time() - sess.get("wizard_refreshed_at", 0) >= WIZARD_REFRESH_SECONDS:
+                    await edit_wizard(user, "Questions", "✍️ Answering questions — reply to each one below.")
+            except asyncio.TimeoutError:
+                await send_outbound(OUT_QUESTION, user.id, lambda: dm.send(embed=Embed(
+                    title="⏳ Time Expired",
+                    description="Your application timed out. Please start again from the panel.",
+                    color=discord.Color.orange()
+                ).set_footer(text=FOOTER_TEXT)))
+                inc("grn_applications_total", outcome="timeout")
+                return
+    finally:
+        close_answer_queue(user.id)
+
+    await post_review(user)
+
+# -------------------------
+# Modal Questionnaire (Modal Mode)
+# -------------------------
+def _modal_label(qkey: str, qtext: str) -> str:
+    """Text input labels are capped at 45 chars; full text lives in the page embed."""
+    label = f"{qkey}: {qtext}"
+    return label if len(label) <= 45 else label[:44] + "…"
+
+class QuestionPageModal(discord.ui.Modal):
+    def __init__(self, pager: "ModalPagerView"):
+        self.pager = pager
+        self.page = pager.page
+        super().__init__(
+            title=f"{pager.dept} Application — Page {self.page + 1}/{pager.total_pages}",
+            timeout=max(1, pager.deadline - time.time()),
+        )
+        self.questions = pager.page_questions()
+        self.inputs: list[discord.ui.TextInput] = []
+        for qkey, qtext in self.questions:
+            ti = discord.ui.TextInput(
+                label=_modal_label(qkey, qtext),
+                placeholder=qtext[:100],
+                style=discord.TextStyle.paragraph,
+                max_length=1000,
+            )
+            self.add_item(ti)
+            self.inputs.append(ti)
+
+    async def on_submit(self, interaction: discord.Interaction):
+        sess = app_sessions.get(self.pager.user_id)
+        if not sess or self.page != self.pager.page:
+            return await interaction.response.send_message("This page was already submitted.", ephemeral=True)
+        sess["answers"].extend((qtext, ti.value.strip()) for (_, qtext), ti in zip(self.questions, self.inputs))
+        save_session(self.pager.user_id)
+        self.pager.page += 1
+        if self.pager.page >= self.pager.total_pages:
+            self.pager.stop()
+            await interaction.response.edit_message(embed=Embed(
+                title="✅ All Pages Completed",
+                description="Thanks! Submitting your application to staff now…",
+                color=self.pager.color
+            ).set_footer(text=FOOTER_TEXT), view=None)
+        else:
+            await interaction.response.edit_message(embed=self.pager.page_embed(), view=self.pager)
+
+    async def on_error(self, interaction: discord.Interaction, error: Exception) -> None:
+        await report_interaction_error(interaction, error, "Question modal failed")
 
-        e = Embed(title=qkey, description=f"{qtext}\n\n_Time remaining: **{readable_remaining(deadline)}**_", color=color)
+class ModalPagerView(SafeView):
+    """DM message carrying a button that opens the next page of questions."""
+    def __init__(self, user_id: int, dept: str, deadline: float):
+        super().__init__(timeout=max(1, deadline - time.time()))
+        self.user_id = user_id
+        self.dept = dept
+        self.deadline = deadline
+        self.color = dept_color(dept)
+        self.questions = DEPT_QUESTIONS[dept]
+        self.total_pages = -(-len(self.questions) // MODAL_PAGE_SIZE)
+        self.page = len(app_sessions.get(user_id, {}).get("answers", [])) // MODAL_PAGE_SIZE
+
+    def page_questions(self) -> list[tuple[str, str]]:
+        start = self.page * MODAL_PAGE_SIZE
+        return self.questions[start:start + MODAL_PAGE_SIZE]
+
+    def page_embed(self) -> Embed:
+        lines = "\n".join(f"**{qkey}** — {qtext}" for qkey, qtext in self.page_questions())
+        e = Embed(
+            title=f"📝 Page {self.page + 1}/{self.total_pages}",
+            description=f"{lines}\n\nPress **Open Page** to answer.\n_Ends <t:{int(self.deadline)}:R>_",
+            color=self.color
+        )
         e.set_footer(text=FOOTER_TEXT)
-        await dm.send(embed=e)
+        return e
 
-        def check(m: discord.Message):
-            return m.author.id == user.id and isinstance(m.channel, discord.DMChannel)
+    @discord.ui.button(label="📝 Open Page", style=discord.ButtonStyle.primary)
+    async def open_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        if interaction.user.id != self.user_id:
+            return await interaction.response.send_message("This application isn’t yours.", ephemeral=True)
+        await interaction.response.send_modal(QuestionPageModal(self))
 
-        try:
-            remaining = max(1, int(deadline - time.time()))
-            timeout = min(remaining, 300)  # 5 minutes per question max
-            msg = await bot.wait_for("message", check=check, timeout=timeout)
-            sess["answers"].append((qtext, msg.content.strip()))
-        except asyncio.TimeoutError:
-            await dm.send(embed=Embed(
-                title="⏳ Time Expired",
-                description="Your application timed out. Please start again from the panel.",
-                color=discord.Color.orange()
-            ).set_footer(text=FOOTER_TEXT))
-            return
+async def run_questions_modal(user: discord.User):
+    """Collect the department questions as modal pages (~4 interactions)."""
+    sess = app_sessions.get(user.id)
+    if not sess:
+        return
+
+    dm = await user.create_dm()
+    pager = ModalPagerView(user.id, sess["dept"], sess["deadline"])
+    if sess.get("wizard_msg_id"):
+        # The pager takes over the wizard message instead of posting a new one
+        msg = dm.get_partial_message(sess["wizard_msg_id"])
+        await msg.edit(embed=pager.page_embed(), view=pager)
+    else:
+        msg = await send_outbound(OUT_QUESTION, user.id, lambda: dm.send(embed=pager.page_embed(), view=pager))
+    timed_out = await pager.wait()
+    if timed_out or len(sess["answers"]) < len(pager.questions):
+        await msg.edit(embed=Embed(
+            title="⏳ Time Expired",
+            description="Your application timed out. Please start again from the panel.",
+            color=discord.Color.orange()
+        ).set_footer(text=FOOTER_TEXT), view=None)
+        inc("grn_applications_total", outcome="timeout")
+        return
 
     await post_review(user)
 
 # -------------------------
 # Review System (Accept / Deny)
 # -------------------------
-class ReviewButtons(SafeView):
-    def __init__(self, applicant: discord.User, dept: str):
-        super().__init__(timeout=None)
-        self.applicant = applicant
-        self.dept = dept
+async def archive_decision(applicant: discord.abc.User, dept: str, decision: str, staff_id: int):
+    try:
+        await asyncio.to_thread(app_archive.record_decision, applicant.id, dept, decision, staff_id)
+    except sqlite3.Error as e:
+        log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Archive decision write failed for {applicant.mention}: `{e}`", priority=LOG_ERROR)
+
+async def log_review_decision(staff: discord.abc.User, applicant: discord.abc.User, dept: str, decision: str, color: discord.Color):
+    await archive_decision(applicant, dept, decision, staff.id)
+    embed = Embed(
+        title=f"📋 Application Decision — {decision}",
+        color=color,
+        description=(
+            f"**Applicant:** {applicant.mention} (`{applicant.id}`)\n"
+            f"**Department:** {dept}\n"
+            f"**Staff Member:** {staff.mention}\n"
+            f"**Decision Time:** <t:{int(time.time())}:f>"
+        )
+    ).set_footer(text=FOOTER_TEXT)
+    log_event(DECISION_LOG_CHANNEL, embed=embed, priority=LOG_AUDIT)
 
-    async def _log_decision(self, staff: discord.Member, decision: str, color: discord.Color):
-        ch = bot.get_channel(DECISION_LOG_CHANNEL)
-        if not ch:
-            return
-        embed = Embed(
-            title=f"📋 Application Decision — {decision}",
-            color=color,
+async def accept_application(staff: discord.abc.User, applicant: discord.abc.User, dept: str, platform: str,
+                             subdept: str, *, log: bool = True, auto_grant: bool = True) -> bool:
+    """DM the acceptance, record it and start the auth pipeline. Returns whether the DM landed.
+
+    auto_grant=False leaves the code to the caller (batch review issues and logs them together).
+    """
+    dm_ok = True
+    try:
+        e = Embed(
+            title="🎉 Application Accepted",
             description=(
-                f"**Applicant:** {self.applicant.mention} (`{self.applicant.id}`)\n"
-                f"**Department:** {self.dept}\n"
-                f"**Staff Member:** {staff.mention}\n"
-                f"**Decision Time:** <t:{int(time.time())}:f>"
-            )
+                f"Congratulations! You’ve been **accepted** into {dept}.\n\n"
+                + ("Your **one-time 6-digit verification code** is on its way.\n" if AUTO_GRANT_ON_ACCEPT else
+                   "A staff member will issue you a **one-time 6-digit verification code** soon.\n")
+                + "⚠️ Keep your DMs **open** — the code expires in **5 minutes** once sent."
+            ),
+            color=GRN_COLOR
+        )
+        e.add_field(
+            name="Next Steps",
+            value=("• Watch for your code DM." if AUTO_GRANT_ON_ACCEPT else "• Wait for staff to issue your code.")
+                  + "\n• Do not share it.\n• Complete verification for main-server access.",
+            inline=False
+        )
+        e.add_field(
+            name="Expectations",
+            value="• Follow all community regulations and SOPs.\n• Be respectful and professional.\n• You’ll receive full access after verification.",
+            inline=False
+        )
+        e.set_footer(text=FOOTER_TEXT)
+        await send_outbound(OUT_DECISION, applicant.id, lambda: applicant.send(embed=e))
+    except Exception:
+        dm_ok = False
+
+    if log:
+        await log_review_decision(staff, applicant, dept, "Accepted", GRN_COLOR)
+    else:
+        await archive_decision(applicant, dept, "Accepted", staff.id)
+    if AUTO_GRANT_ON_ACCEPT and auto_grant:
+        await queue_auto_grant(applicant.id, dept, platform, subdept, staff.id)
+    return dm_ok
+
+async def deny_application(staff: discord.abc.User, applicant: discord.abc.User, dept: str, *, log: bool = True) -> bool:
+    """DM the denial, start the reapply cooldown and record it. Returns whether the DM landed."""
+    dm_ok = True
+    try:
+        e = Embed(
+            title="❌ Application Denied",
+            description="Unfortunately, your application was **denied**.\n\nYou may reapply after **12 hours**. \nPlease review the rules before resubmitting.",
+            color=discord.Color.red()
         ).set_footer(text=FOOTER_TEXT)
-        await ch.send(embed=embed)
+        await send_outbound(OUT_DECISION, applicant.id, lambda: applicant.send(embed=e))
+    except Exception:
+        dm_ok = False
+
+    await start_reapply_cooldown(applicant.id, dept, staff.id)
+    if log:
+        await log_review_decision(staff, applicant, dept, "Denied", discord.Color.red())
+    else:
+        await archive_decision(applicant, dept, "Denied", staff.id)
+    return dm_ok
+
+class ReviewButton(
+    discord.ui.DynamicItem[discord.ui.Button],
+    template=r"review:(?P<action>accept|deny):(?P<uid>\d+):(?P<dept>[A-Z]+):(?P<platform>[\w/]+):(?P<subdept>[\w/]+)",
+):
+    """Stateless review action — everything it needs lives in the custom_id."""
+
+    def __init__(self, action: str, applicant_id: int, dept: str, platform: str, subdept: str, *, disabled: bool = False):
+        self.action = action
+        self.applicant_id = applicant_id
+        self.dept = dept
+        self.platform = platform or "N/A"
+        self.subdept = subdept or "N/A"
+        accept = action == "accept"
+        super().__init__(discord.ui.Button(
+            label="✅ Accept" if accept else "❌ Deny",
+            style=discord.ButtonStyle.success if accept else discord.ButtonStyle.danger,
+            custom_id=f"review:{action}:{applicant_id}:{dept}:{self.platform}:{self.subdept}",
+            disabled=disabled,
+        ))
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str], /):
+        return cls(match["action"], int(match["uid"]), match["dept"], match["platform"], match["subdept"])
+
+    async def callback(self, interaction: discord.Interaction):
+        if self.action == "accept":
+            await self.accept(interaction)
+        else:
+            await self.deny(interaction)
+
+    async def _close_card(self, interaction: discord.Interaction) -> discord.User:
+        await interaction.response.defer(ephemeral=True)
+        await interaction.message.edit(view=review_view(self.applicant_id, self.dept, self.platform, self.subdept, disabled=True))
+        return bot.get_user(self.applicant_id) or await bot.fetch_user(self.applicant_id)
 
     # ---------- Accept ----------
-    @discord.ui.button(label="✅ Accept", style=discord.ButtonStyle.success, custom_id="review_accept")
-    async def accept(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def accept(self, interaction: discord.Interaction):
         try:
-            await interaction.response.defer(ephemeral=True)
-            for child in self.children: child.disabled = True
-            await interaction.message.edit(view=self)
-
-            try:
-                e = Embed(
-                    title="🎉 Application Accepted",
-                    description=(
-                        f"Congratulations! You’ve been **accepted** into {self.dept}.\n\n"
-                        "A staff member will issue you a **one-time 6-digit verification code** soon.\n"
-                        "⚠️ Keep your DMs **open** — the code expires in **5 minutes** once sent."
-                    ),
-                    color=GRN_COLOR
-                )
-                e.add_field(
-                    name="Next Steps",
-                    value="• Wait for staff to issue your code.\n• Do not share it.\n• Complete verification for main-server access.",
-                    inline=False
-                )
-                e.add_field(
-                    name="Expectations",
-                    value="• Follow all community regulations and SOPs.\n• Be respectful and professional.\n• You’ll receive full access after verification.",
-                    inline=False
-                )
-                e.set_footer(text=FOOTER_TEXT)
-                await self.applicant.send(embed=e)
-            except Exception:
+            applicant = await self._close_card(interaction)
+            if not await accept_application(interaction.user, applicant, self.dept, self.platform, self.subdept):
                 await interaction.followup.send("⚠️ Couldn’t DM the applicant (DMs likely closed).", ephemeral=True)
-
-            await self._log_decision(interaction.user, "Accepted", GRN_COLOR)
-            await interaction.followup.send(f"✅ Accepted {self.applicant.mention}", ephemeral=True)
+            await interaction.followup.send(f"✅ Accepted {applicant.mention}", ephemeral=True)
         except Exception as e:
             await report_interaction_error(interaction, e, "Accept button failed")
 
     # ---------- Deny ----------
-    @discord.ui.button(label="❌ Deny", style=discord.ButtonStyle.danger, custom_id="review_deny")
-    async def deny(self, interaction: discord.Interaction, button: discord.ui.Button):
+    async def deny(self, interaction: discord.Interaction):
         try:
-            await interaction.response.defer(ephemeral=True)
-            for child in self.children: child.disabled = True
-            await interaction.message.edit(view=self)
-
-            try:
-                e = Embed(
-                    title="❌ Application Denied",
-                    description="Unfortunately, your application was **denied**.\n\nYou may reapply after **12 hours**. \nPlease review the rules before resubmitting.",
-                    color=discord.Color.red()
-                ).set_footer(text=FOOTER_TEXT)
-                await self.applicant.send(embed=e)
-            except Exception:
+            applicant = await self._close_card(interaction)
+            if not await deny_application(interaction.user, applicant, self.dept):
                 await interaction.followup.send("⚠️ Couldn’t DM the applicant (DMs likely closed).", ephemeral=True)
-
-            await self._log_decision(interaction.user, "Denied", discord.Color.red())
-            await interaction.followup.send(f"❌ Denied {self.applicant.mention}", ephemeral=True)
+            await interaction.followup.send(f"❌ Denied {applicant.mention}", ephemeral=True)
         except Exception as e:
             await report_interaction_error(interaction, e, "Deny button failed")
 
+def review_view(applicant_id: int, dept: str, platform: str, subdept: str, *, disabled: bool = False) -> View:
+    """Accept/Deny row for a review card; served by the ReviewButton dynamic item."""
+    v = View(timeout=None)
+    for action in ("accept", "deny"):
+        v.add_item(ReviewButton(action, applicant_id, dept, platform, subdept, disabled=disabled))
+    return v
+
 # -------------------------
-# Post Review Embed (Sent to Staff)
+# Reapply Cooldown (after a denial)
 # -------------------------
-async def post_review(user: discord.User):
-    sess = app_sessions.get(user.id)
-    if not sess:
-        return
-
-    dept = sess.get("dept", "N/A")
-    color = dept_color(dept)
-    platform = sess.get("platform", "N/A")
-    subdept = sess.get("subdept", "N/A")
+# Cooldowns live in checkpoint_store so they survive restarts; its expires_at index
+# lets one scheduler task lift them in deadline order.
+COOLDOWN_SWEEP_MAX_SLEEP = 300
+
+async def reapply_blocked_until(user_id: int) -> float | None:
+    rec = await asyncio.to_thread(checkpoint_store.get, "reapply_cooldowns", user_id)
+    return rec["until"] if rec and rec["until"] > time.time() else None
+
+async def start_reapply_cooldown(user_id: int, dept: str, staff_id: int):
+    until = time.time() + REAPPLY_COOLDOWN_SECONDS
+    await asyncio.to_thread(
+        checkpoint_store.put, "reapply_cooldowns", user_id,
+        {"until": until, "dept": dept, "denied_by": staff_id}, ttl=REAPPLY_COOLDOWN_SECONDS,
+    )
+    hq = bot.get_guild(HQ_GUILD_ID)
+    member = hq and hq.get_member(user_id)
+    if member and hq.get_role(ROLE_DENIED_12H):
+        try:
+            await run_role_op(HQ_GUILD_ID, f"denied-cooldown role for <@{user_id}>",
+                              lambda: member.add_roles(Object(id=ROLE_DENIED_12H), reason="Application denied — 12h cooldown"))
+        except Exception:
+            pass  # dead-lettered; the stored cooldown still blocks reapplying
+
+async def cooldown_expiry_scheduler():
+    """Single task lifting expired reapply cooldowns (including ones that lapsed while offline)."""
+    while True:
+        try:
+            expired = await asyncio.to_thread(checkpoint_store.pop_expired, "reapply_cooldowns", time.time())
+            hq = bot.get_guild(HQ_GUILD_ID)
+            for key, _, _ in expired:
+                member = hq and hq.get_member(int(key))
+                if member and any(r.id == ROLE_DENIED_12H for r in member.roles):
+                    try:
+                        await run_role_op(HQ_GUILD_ID, f"lift denied-cooldown role for {member.mention}",
+                                          lambda m=member: m.remove_roles(Object(id=ROLE_DENIED_12H), reason="Reapply cooldown expired"))
+                    except Exception:
+                        pass  # dead-lettered
+            if len(expired) >= 500:
+                continue
+            nxt = await asyncio.to_thread(checkpoint_store.next_expiry, "reapply_cooldowns")
+            delay = COOLDOWN_SWEEP_MAX_SLEEP if nxt is None else min(COOLDOWN_SWEEP_MAX_SLEEP, max(1.0, nxt - time.time()))
+        except Exception as e:
+            print("cooldown scheduler error:", e)
+            delay = COOLDOWN_SWEEP_MAX_SLEEP
+        await asyncio.sleep(delay)
 
-    review = Embed(
+# -------------------------
+# Review Card Rendering
+# -------------------------
+# Discord limits: 6000 chars per embed *and* per message, 25 fields, 10 embeds per message
+EMBED_TOTAL_MAX     = 6000
+EMBED_FIELDS_MAX    = 25
+FIELD_NAME_MAX      = 256
+FIELD_VALUE_MAX     = 1024
+MESSAGE_EMBEDS_MAX  = 10
+REVIEW_MAX_MESSAGES = 3     # anything beyond this only goes in the transcript file
+REVIEW_HEADER_SLACK = 80    # room for the "transcript attached" note added after packing
+
+def review_transcript(record: dict) -> str:
+    lines = [f"{record['dept']} / {record['subdept']} / {record['platform']} — applicant {record['user_id']}", ""]
+    for idx, (q, a) in enumerate(record["answers"], start=1):
+        lines += [f"Q{idx}: {q}", f"A: {a or '—'}", ""]
+    return "\n".join(lines)
+
+def render_review(record: dict) -> Tuple[List[List[Embed]], str | None]:
+    """Pack the Q&A into as few embeds/messages as the limits allow; returns (messages, transcript or None)."""
+    dept, platform, subdept = record["dept"], record["platform"], record["subdept"]
+    color = dept_color(dept)
+    header = Embed(
         title="📂 New Application Submitted",
         color=color,
         description=(
-            f"**Applicant:** {user.mention} (`{user.id}`)\n"
+            f"**Applicant:** <@{record['user_id']}> (`{record['user_id']}`)\n"
             f"**Department:** {dept}\n"
             f"**Sub-Department:** {subdept}\n"
             f"**Platform:** {platform}\n"
         )
     ).set_footer(text=FOOTER_TEXT)
+    if sim := record.get("similar"):
+        header.description += (
+            f"⚠️ **{round(sim['score'] * 100)}% similar** to application #{sim['id']} "
+            f"by <@{sim['user_id']}> on <t:{int(sim['submitted_at'])}:d>\n"
+        )
 
-    for idx, (q, a) in enumerate(sess.get("answers", []), start=1):
+    # Answers stay in order, so greedy next-fit already gives the fewest embeds
+    embeds = [header]
+    overflow = False
+    for idx, (q, a) in enumerate(record["answers"], start=1):
         name = f"Q{idx}: {q}"
-        if len(name) > 256: name = name[:253] + "…"
-        review.add_field(name=name, value=(a[:1000] if a else "—"), inline=False)
-
+        if len(name) > FIELD_NAME_MAX:
+            name = name[:FIELD_NAME_MAX - 1] + "…"
+        value = a or "—"
+        if len(value) > FIELD_VALUE_MAX:
+            value = value[:FIELD_VALUE_MAX - 30] + "… *(see transcript)*"
+            overflow = True
+        cur = embeds[-1]
+        budget = EMBED_TOTAL_MAX - (REVIEW_HEADER_SLACK if cur is header else 0)
+        if len(cur.fields) >= EMBED_FIELDS_MAX or len(cur) + len(name) + len(value) > budget:
+            cur = Embed(color=color)
+            embeds.append(cur)
+        cur.add_field(name=name, value=value, inline=False)
+
+    messages: List[List[Embed]] = []
+    for embed in embeds:
+        if (not messages or len(messages[-1]) >= MESSAGE_EMBEDS_MAX
+                or sum(map(len, messages[-1])) + len(embed) > EMBED_TOTAL_MAX - REVIEW_HEADER_SLACK):
+            messages.append([])
+        messages[-1].append(embed)
+    if len(messages) > REVIEW_MAX_MESSAGES:
+        del messages[REVIEW_MAX_MESSAGES:]
+        overflow = True
+
+    if not overflow:
+        return messages, None
+    header.description += "📎 *Long application — full transcript attached.*\n"
+    return messages, review_transcript(record)
+
+async def deliver_review(record: dict) -> int | None:
+    """Post the review card(s); buttons + transcript ride on the last message, whose id is returned."""
     ch = bot.get_channel(APP_REVIEW_CHANNEL_ID)
-    if ch:
-        await ch.send(embed=review, view=ReviewButtons(user, dept))
+    if not ch:
+        return None
+    messages, transcript = render_review(record)
+    try:
+        for i, embeds in enumerate(messages):
+            if i < len(messages) - 1:
+                await ch.send(embeds=embeds)
+                continue
+            extra = {}
+            if transcript:
+                extra["file"] = discord.File(io.BytesIO(transcript.encode()), filename=f"application-{record['user_id']}.txt")
+            card = await ch.send(embeds=embeds, view=review_view(record["user_id"], record["dept"], record["platform"], record["subdept"]), **extra)
+    except discord.HTTPException as e:
+        log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Review card for <@{record['user_id']}> failed to post: `{e.status}` {str(e.text)[:300]}", priority=LOG_ERROR)
+        return None
+    if record.get("archive_id"):
+        try:
+            await asyncio.to_thread(app_archive.set_review_message, record["archive_id"], card.id)
+        except sqlite3.Error:
+            pass  # only used to close the card from batch review
+    return card.id
 
+async def retry_review_outbox():
+    """Re-post review cards that were persisted but never made it to the channel."""
+    for key, record in await asyncio.to_thread(checkpoint_store.items, "review_outbox"):
+        if await deliver_review(record) is not None:
+            await asyncio.to_thread(checkpoint_store.delete, "review_outbox", key)
+
+async def post_review(user: discord.User):
+    sess = app_sessions.get(user.id)
+    if not sess:
+        return
+
+    record = {
+        "user_id": user.id,
+        "dept": sess.get("dept", "N/A"),
+        "platform": sess.get("platform", "N/A"),
+        "subdept": sess.get("subdept", "N/A"),
+        "answers": list(sess.get("answers", [])),
+        "submitted_at": time.time(),
+    }
+
+    # Fingerprint the department-specific answers and look for copy-pasted sets
+    signature = None
     try:
-        await user.send(embed=Embed(
-            title="📋 Application Status",
-            description="✅ **Application Submitted**\nYour application has been delivered to staff for review. You’ll receive a DM once a decision is made.",
-            color=color
-        ).set_footer(text=FOOTER_TEXT))
-    except Exception:
-        pass
+        signature = await asyncio.to_thread(minhash_signature, [a for _, a in record["answers"][len(COMMON_4):]])
+        match = signature and await asyncio.to_thread(app_archive.find_similar, signature, user.id)
+        if match and match["score"] >= SIMILARITY_FLAG:
+            record["similar"] = match
+    except sqlite3.Error as e:
+        print("similarity lookup error:", e)
+
+    inc("grn_applications_total", outcome="submitted")
+
+    # Persist first — the outbox entry only goes once staff can actually see the card
+    try:
+        record["archive_id"] = await asyncio.to_thread(app_archive.record_submission, record, signature)
+    except sqlite3.Error as e:
+        log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Archive write failed for <@{user.id}>: `{e}`", priority=LOG_ERROR)
+    await asyncio.to_thread(checkpoint_store.put, "review_outbox", user.id, record)
+    if await deliver_review(record) is not None:
+        await asyncio.to_thread(checkpoint_store.delete, "review_outbox", user.id)
+
+    submitted = "✅ **Application Submitted**\nYour application has been delivered to staff for review. You’ll receive a DM once a decision is made."
+    sess["deadline"] = None  # stop the countdown on the wizard
+    if not await edit_wizard(user, "Submitted", submitted, color=GRN_COLOR):
+        try:
+            await user.send(embed=Embed(
+                title="📋 Application Status",
+                description=submitted,
+                color=dept_color(record["dept"])
+            ).set_footer(text=FOOTER_TEXT))
+        except Exception:
+            pass
 
-    app_sessions.pop(user.id, None)
+    drop_session(user.id)
 
 # =====================================================
 # Section 4 — Role Assignment System & /auth_grant Command
 # =====================================================
 
 # -------------------------
-# PS4 Role Assignment (Mirrored)
+# Role Plan (platform, dept, subdept → starter roles)
 # -------------------------
-async def assign_ps_roles_ps4(member: discord.Member, dept: str, subdept: str | None):
-    """Assign starter roles + callsign for PS4 department."""
-    to_add: list[discord.Role] = []
+# Subdept is "N/A" for every department except PSO.
+ROLE_PLAN: Dict[Tuple[str, str, str], Tuple[int, ...]] = {
+    ("PS4", "PSO", "SASP"):  (ROLE_SASP_CATEGORY_PS4, ROLE_SASP_PS4, ROLE_SASP_CADET_PS4),
+    ("PS4", "PSO", "BCSO"):  (ROLE_BCSO_CATEGORY_PS4, ROLE_BCSO_PS4, ROLE_BCSO_PROB_PS4),
+    ("PS4", "CO", "N/A"):    (ROLE_CO_MAIN_PS4, ROLE_CO_CATEGORY_PS4, ROLE_CO_STARTER_PS4),
+    ("PS4", "SAFR", "N/A"):  (ROLE_SAFR_MAIN_PS4, ROLE_SAFR_CATEGORY_PS4, ROLE_SAFR_STARTER_PS4),
+
+    ("PS5", "PSO", "SASP"):  (ROLE_SASP_CATEGORY_PS5, ROLE_SASP_PS5, ROLE_SASP_CADET_PS5),
+    ("PS5", "PSO", "BCSO"):  (ROLE_BCSO_CATEGORY_PS5, ROLE_BCSO_PS5, ROLE_BCSO_PROB_PS5),
+    ("PS5", "CO", "N/A"):    (ROLE_CO_MAIN_PS5, ROLE_CO_CATEGORY_PS5, ROLE_CO_STARTER_PS5),
+    ("PS5", "SAFR", "N/A"):  (ROLE_SAFR_MAIN_PS5, ROLE_SAFR_CATEGORY_PS5, ROLE_SAFR_STARTER_PS5),
+
+    # XboxOG department roles are not configured yet — callsign only
+    ("XboxOG", "PSO", "SASP"): (),
+    ("XboxOG", "PSO", "BCSO"): (),
+    ("XboxOG", "CO", "N/A"):   (),
+    ("XboxOG", "SAFR", "N/A"): (),
+}
 
-    if dept == "PSO":
-        sd = (subdept or "").upper()
-        if sd == "SASP":
-            for rid in (ROLE_SASP_CATEGORY_PS4, ROLE_SASP_PS4, ROLE_SASP_CADET_PS4):
-                if r := member.guild.get_role(rid):
-                    to_add.append(r)
-        elif sd == "BCSO":
-            for rid in (ROLE_BCSO_CATEGORY_PS4, ROLE_BCSO_PS4, ROLE_BCSO_PROB_PS4):
-                if r := member.guild.get_role(rid):
-                    to_add.append(r)
-        try:
-            await member.edit(nick=f"C-{random.randint(1000,1999)} | {member.name}", reason="Initial PSO callsign (PS4)")
-        except Exception:
-            pass
+# Callsign prefix + number range per department
+CALLSIGN_FORMATS: Dict[str, Tuple[str, int, int]] = {
+    "PSO":  ("C",   1000, 1999),
+    "CO":   ("CIV", 1000, 1999),
+    "SAFR": ("FF",  100,  999),
+}
+CALLSIGN_RE = re.compile(r"^(?P<prefix>C|CIV|FF)-(?P<num>\d+) \|")
 
-    elif dept == "CO":
-        for rid in (ROLE_CO_MAIN_PS4, ROLE_CO_CATEGORY_PS4, ROLE_CO_STARTER_PS4):
-            if r := member.guild.get_role(rid):
-                to_add.append(r)
-        try:
-            await member.edit(nick=f"CIV-{random.randint(1000,1999)} | {member.name}", reason="Initial CO callsign (PS4)")
-        except Exception:
-            pass
+# Role plan filtered to roles that actually exist, filled by validate_role_plan()
+resolved_role_plan: Dict[Tuple[str, str, str], Tuple[int, ...]] = {}
 
-    elif dept == "SAFR":
-        for rid in (ROLE_SAFR_MAIN_PS4, ROLE_SAFR_CATEGORY_PS4, ROLE_SAFR_STARTER_PS4):
-            if r := member.guild.get_role(rid):
-                to_add.append(r)
-        try:
-            await member.edit(nick=f"FF-{random.randint(100,999)} | {member.name}", reason="Initial SAFR callsign (PS4)")
-        except Exception:
-            pass
+def role_plan_key(platform: str, dept: str, subdept: str | None) -> Tuple[str, str, str]:
+    sd = (subdept or "").upper() if dept == "PSO" else "N/A"
+    return (platform, dept, sd)
 
-    if to_add:
-        try:
-            await member.add_roles(*to_add, reason="Initial department roles (PS4)")
-        except Exception:
-            pass
-    elif dept == "PSO":
-        hq = bot.get_guild(HQ_GUILD_ID)
-        if hq and (ch := hq.get_channel(AUTH_CODE_LOG_CHANNEL)):
-            await ch.send("⚠️ PSO role assignment skipped on PS4 — verify SASP/BCSO role IDs.")
+def planned_platform_roles(platform: str, dept: str, subdept: str | None) -> Tuple[int, ...]:
+    """Starter role IDs for a platform guild (validated set once the bot is ready)."""
+    key = role_plan_key(platform, dept, subdept)
+    return resolved_role_plan.get(key, ROLE_PLAN.get(key, ()))
 
+def initial_callsign(dept: str, username: str, guild_id: int, member_id: int) -> str | None:
+    """Reserve a unique callsign for this member (None if the guild isn't indexed or the pool is full)."""
+    if dept not in CALLSIGN_FORMATS:
+        return None
+    prefix = CALLSIGN_FORMATS[dept][0]
+    num = allocate_callsign(guild_id, prefix, member_id)
+    return None if num is None else f"{prefix}-{num} | {username}"[:32]
 
 # -------------------------
-# PS5 Role Assignment (Mirrored)
+# Callsign Allocator
 # -------------------------
-async def assign_ps_roles_ps5(member: discord.Member, dept: str, subdept: str | None):
-    """Assign starter roles + callsign for PS5 department."""
-    to_add: list[discord.Role] = []
+CALLSIGN_WARN_FREE = int(os.getenv("CALLSIGN_WARN_FREE", "50"))  # warn when a pool gets this low
 
-    if dept == "PSO":
-        sd = (subdept or "").upper()
-        if sd == "SASP":
-            for rid in (ROLE_SASP_CATEGORY_PS5, ROLE_SASP_PS5, ROLE_SASP_CADET_PS5):
-                if r := member.guild.get_role(rid):
-                    to_add.append(r)
-        elif sd == "BCSO":
-            for rid in (ROLE_BCSO_CATEGORY_PS5, ROLE_BCSO_PS5, ROLE_BCSO_PROB_PS5):
-                if r := member.guild.get_role(rid):
-                    to_add.append(r)
-        try:
-            await member.edit(nick=f"C-{random.randint(1000,1999)} | {member.name}", reason="Initial PSO callsign (PS5)")
-        except Exception:
-            pass
+class CallsignPool:
+    """Taken-number bitset for one (guild, prefix) range; bit i ↔ number lo + i."""
 
-    elif dept == "CO":
-        for rid in (ROLE_CO_MAIN_PS5, ROLE_CO_CATEGORY_PS5, ROLE_CO_STARTER_PS5):
-            if r := member.guild.get_role(rid):
-                to_add.append(r)
-        try:
-            await member.edit(nick=f"CIV-{random.randint(1000,1999)} | {member.name}", reason="Initial CO callsign (PS5)")
-        except Exception:
-            pass
+    def __init__(self, lo: int, hi: int):
+        self.lo, self.hi = lo, hi
+        self.mask = (1 << (hi - lo + 1)) - 1
+        self.taken = 0
+        self.counts: Dict[int, int] = {}   # number → members wearing it (duplicates predate the allocator)
+        self.holders: Dict[int, int] = {}  # member id → number
+        self.warned = False
 
-    elif dept == "SAFR":
-        for rid in (ROLE_SAFR_MAIN_PS5, ROLE_SAFR_CATEGORY_PS5, ROLE_SAFR_STARTER_PS5):
-            if r := member.guild.get_role(rid):
-                to_add.append(r)
-        try:
-            await member.edit(nick=f"FF-{random.randint(100,999)} | {member.name}", reason="Initial SAFR callsign (PS5)")
-        except Exception:
-            pass
+    def free(self) -> int:
+        return (self.hi - self.lo + 1) - self.taken.bit_count()
 
-    if to_add:
-        try:
-            await member.add_roles(*to_add, reason="Initial department roles (PS5)")
-        except Exception:
-            pass
-    elif dept == "PSO":
-        hq = bot.get_guild(HQ_GUILD_ID)
-        if hq and (ch := hq.get_channel(AUTH_CODE_LOG_CHANNEL)):
-            await ch.send("⚠️ PSO role assignment skipped on PS5 — verify SASP/BCSO role IDs.")
+    def claim(self, member_id: int, num: int):
+        self.release(member_id)
+        if not self.lo <= num <= self.hi:
+            return
+        self.holders[member_id] = num
+        self.counts[num] = self.counts.get(num, 0) + 1
+        self.taken |= 1 << (num - self.lo)
+
+    def release(self, member_id: int):
+        num = self.holders.pop(member_id, None)
+        if num is None:
+            return
+        self.counts[num] -= 1
+        if not self.counts[num]:
+            del self.counts[num]
+            self.taken &= ~(1 << (num - self.lo))
+
+    def allocate(self, member_id: int) -> int | None:
+        if member_id in self.holders:
+            return self.holders[member_id]
+        free = ~self.taken & self.mask
+        if not free:
+            return None
+        num = self.lo + (free & -free).bit_length() - 1  # lowest free bit
+        self.claim(member_id, num)
+        return num
+
+# (guild id, prefix) → pool; only guilds indexed by this process can allocate
+callsign_pools: Dict[Tuple[int, str], CallsignPool] = {}
+callsign_lock = threading.Lock()  # build_join_body allocates from Flask threads
+
+def _track_callsign(guild_id: int, member_id: int, nick: str | None):
+    for (gid, _), pool in callsign_pools.items():
+        if gid == guild_id:
+            pool.release(member_id)
+    if (m := CALLSIGN_RE.match(nick or "")) and (pool := callsign_pools.get((guild_id, m["prefix"]))):
+        pool.claim(member_id, int(m["num"]))
+
+def index_guild_callsigns(guild: discord.Guild):
+    """Scan member nicknames once and rebuild the guild's callsign pools."""
+    with callsign_lock:
+        for prefix, lo, hi in CALLSIGN_FORMATS.values():
+            callsign_pools[(guild.id, prefix)] = CallsignPool(lo, hi)
+        for member in guild.members:
+            _track_callsign(guild.id, member.id, member.nick)
+
+def allocate_callsign(guild_id: int, prefix: str, member_id: int) -> int | None:
+    with callsign_lock:
+        pool = callsign_pools.get((guild_id, prefix))
+        if not pool:
+            return None
+        num = pool.allocate(member_id)
+        low = pool.free() <= CALLSIGN_WARN_FREE and not pool.warned
+        pool.warned = pool.warned or low
+    if low:
+        warn_callsign_pool(guild_id, prefix, pool)
+    return num
+
+def warn_callsign_pool(guild_id: int, prefix: str, pool: CallsignPool):
+    guild = bot.get_guild(guild_id)
+    log_event(
+        AUTH_CODE_LOG_CHANNEL,
+        f"⚠️ Callsign pool `{prefix}-{pool.lo}…{pool.hi}` on **{guild.name if guild else guild_id}** "
+        f"has **{pool.free()}** numbers left.",
+        priority=LOG_ERROR,
+    )
 
+@bot.listen("on_member_join")
+async def callsign_on_join(member: discord.Member):
+    with callsign_lock:
+        _track_callsign(member.guild.id, member.id, member.nick)
+
+@bot.listen("on_member_update")
+async def callsign_on_update(before: discord.Member, after: discord.Member):
+    if before.nick != after.nick:
+        with callsign_lock:
+            _track_callsign(after.guild.id, after.id, after.nick)
+
+@bot.listen("on_member_remove")
+async def callsign_on_remove(member: discord.Member):
+    with callsign_lock:
+        _track_callsign(member.guild.id, member.id, None)
+
+async def validate_role_plan():
+    """Resolve ROLE_PLAN against each platform guild and report missing roles."""
+    problems: list[str] = []
+    for key, role_ids in ROLE_PLAN.items():
+        platform = key[0]
+        guild = bot.get_guild(PLATFORM_GUILDS.get(platform, 0))
+        if not guild:
+            continue
+        present = tuple(rid for rid in role_ids if guild.get_role(rid))
+        resolved_role_plan[key] = present
+        if missing := [rid for rid in role_ids if rid not in present]:
+            problems.append(f"• `{'/'.join(key)}` missing roles: " + ", ".join(f"`{rid}`" for rid in missing))
+        elif not role_ids:
+            problems.append(f"• `{'/'.join(key)}` has no department roles configured")
+    if problems:
+        log_event(AUTH_CODE_LOG_CHANNEL, "⚠️ **Role plan check**\n" + "\n".join(problems)[:3000], priority=LOG_ERROR)
+
+# -------------------------
+# Role Assignment Queue (per guild)
+# -------------------------
+# Discord buckets member-modify calls per guild, so each guild gets its own small worker pool.
+ROLE_QUEUE_CONCURRENCY = int(os.getenv("ROLE_QUEUE_CONCURRENCY", "2"))
+ROLE_QUEUE_RETRIES = int(os.getenv("ROLE_QUEUE_RETRIES", "4"))
+ROLE_DEAD_LETTER_MAX = 100
+
+role_queues: Dict[int, asyncio.Queue] = {}
+role_dead_letters: List[dict] = []
+role_queue_stats = {"enqueued": 0, "done": 0, "retried": 0, "dead": 0, "last_wait_s": 0.0, "max_wait_s": 0.0, "last_run_s": 0.0}
+
+def _role_op_transient(e: Exception) -> bool:
+    if isinstance(e, discord.HTTPException):
+        return e.status == 429 or e.status >= 500
+    return isinstance(e, (aiohttp.ClientError, asyncio.TimeoutError))
+
+async def role_queue_worker(guild_id: int):
+    queue = role_queues[guild_id]
+    while True:
+        label, factory, fut, enqueued_at = await queue.get()
+        wait = time.perf_counter() - enqueued_at
+        role_queue_stats["last_wait_s"] = wait
+        role_queue_stats["max_wait_s"] = max(role_queue_stats["max_wait_s"], wait)
+        t = time.perf_counter()
+        for attempt in range(ROLE_QUEUE_RETRIES + 1):
+            try:
+                result = await factory()
+            except Exception as e:
+                if isinstance(e, discord.HTTPException) and e.status == 429:
+                    inc("grn_discord_429_total", source="role_queue")
+                if _role_op_transient(e) and attempt < ROLE_QUEUE_RETRIES:
+                    role_queue_stats["retried"] += 1
+                    await asyncio.sleep(min(16.0, 1.0 * 2 ** attempt) + random.uniform(0, 0.5))
+                    continue
+                role_queue_stats["dead"] += 1
+                dead_letter_role_op(guild_id, label, e, attempt + 1)
+                if not fut.done():
+                    fut.set_exception(e)
+            else:
+                role_queue_stats["done"] += 1
+                if not fut.done():
+                    fut.set_result(result)
+            break
+        role_queue_stats["last_run_s"] = time.perf_counter() - t
+        queue.task_done()
+
+async def run_role_op(guild_id: int, label: str, factory):
+    """Queue `factory()` (a member edit) on the guild's workers and wait for its result."""
+    if guild_id not in role_queues:
+        role_queues[guild_id] = asyncio.Queue()
+    for i in range(ROLE_QUEUE_CONCURRENCY):
+        start_background_task(f"role_queue:{guild_id}:{i}", lambda: role_queue_worker(guild_id))
+    fut = asyncio.get_running_loop().create_future()
+    role_queue_stats["enqueued"] += 1
+    role_queues[guild_id].put_nowait((label, factory, fut, time.perf_counter()))
+    return await fut
+
+def dead_letter_role_op(guild_id: int, label: str, error: Exception, attempts: int):
+    entry = {"guild_id": guild_id, "label": label, "error": f"{type(error).__name__}: {error}"[:300], "attempts": attempts, "at": time.time()}
+    role_dead_letters.append(entry)
+    del role_dead_letters[:-ROLE_DEAD_LETTER_MAX]
+    log_event(AUTH_CODE_LOG_CHANNEL, f"☠️ **Role op failed** after {attempts} attempt(s) — {label}\n`{entry['error']}`", priority=LOG_ERROR)
+
+def role_queue_metrics() -> dict:
+    return {
+        "depth": {gid: q.qsize() for gid, q in role_queues.items()},
+        "dead_letters": len(role_dead_letters),
+        **role_queue_stats,
+    }
+
+async def apply_role_plan(member: discord.Member, platform: str, dept: str, subdept: str | None) -> bool:
+    """Bring a platform-guild member up to their plan in one PATCH (no-op if already there)."""
+    plan = planned_platform_roles(platform, dept, subdept)
+    current = {r.id for r in member.roles if not r.is_default()}
+    missing = [rid for rid in plan if rid not in current]
+
+    edit: dict = {}
+    if missing:
+        edit["roles"] = [Object(id=rid) for rid in current | set(missing)]
+    # Keep an existing callsign so retries never re-roll it
+    if not CALLSIGN_RE.match(member.nick or "") and (nick := initial_callsign(dept, member.name, member.guild.id, member.id)):
+        edit["nick"] = nick
+
+    if not plan and dept == "PSO":
+        log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ PSO role assignment skipped on {platform} — verify SASP/BCSO role IDs.", priority=LOG_ERROR)
+    if not edit:
+        return True
+    try:
+        await run_role_op(
+            member.guild.id, f"{dept} role plan for {member.mention} on {platform}",
+            lambda: member.edit(**edit, reason=f"Initial {dept} roles + callsign ({platform})"),
+        )
+        return True
+    except Exception:
+        # Hand back the reserved callsign — the nick never changed (failure already dead-lettered)
+        with callsign_lock:
+            _track_callsign(member.guild.id, member.id, member.nick)
+        return False
+
+def format_stages(stages: Dict[str, float]) -> str:
+    return " | ".join(f"{k} {v * 1000:.0f}ms" for k, v in stages.items())
+
+
+# -------------------------
+# Auth Code Issuing
+# -------------------------
+async def issue_auth_code(user: discord.abc.User, dept: str, platform: str, subdept: str, granted_by: str,
+                          *, log: bool = True) -> Tuple[int | str, bool]:
+    """Create the one-time code (stored or signed), log it and DM it. Returns (code, whether the DM landed)."""
+    record = {
+        "timestamp": time.time(),
+        "dept": dept,
+        "platform": platform,
+        "subdept": subdept,
+    }
+    verify_url = REDIRECT_URI
+    if AUTH_CODE_MODE == "signed":
+        # Everything needed to redeem travels in the link — nothing stored
+        token, code = issue_signed_token(user.id, dept, platform, subdept)
+        verify_url = f"{REDIRECT_URI}?{urllib.parse.urlencode({'t': token})}"
+    else:
+        code = random.randint(100000, 999999)
+        record["code"] = code
+        state_store.put("pending_codes", user.id, record, ttl=CODE_TTL_SECONDS)
+
+    # Log generation (bulk grants write one consolidated entry instead)
+    if log:
+        log_event(
+            AUTH_CODE_LOG_CHANNEL,
+            f"🔐 **Auth Code Generated**\n"
+            f"User: {user.mention} (`{user.id}`)\n"
+            f"Department: `{dept}` | Platform: `{platform}` | Subdept: `{subdept}`\n"
+            f"Code: **{code}** (expires in 5 minutes)\n"
+            f"Granted by: {granted_by}",
+            priority=LOG_AUDIT,
+        )
+
+    # DM applicant
+    try:
+        e = Embed(
+            title="🔐 Grant Roleplay Network™ — Authorization",
+            description=(
+                f"**Your one-time 6-digit code:** `{code}`\n"
+                "Use this code on the verification page below. Once redeemed, it becomes invalid.\n\n"
+                f"[Click here to Verify]({verify_url})"
+            ),
+            color=GRN_COLOR
+        )
+        e.set_image(url=ACCEPT_GIF_URL)
+        e.set_footer(text=FOOTER_TEXT)
+        v = SafeView()
+        v.add_item(discord.ui.Button(label="Open Verification", url=verify_url, style=discord.ButtonStyle.link))
+        await send_outbound(OUT_AUTH, user.id, lambda: user.send(embed=e, view=v))
+        return code, True
+    except Exception:
+        return code, False
 
 # -------------------------
 # /auth_grant Command — Generate 6-Digit Code
@@ -823,60 +2625,705 @@ async def auth_grant(
             return await interaction.response.send_message("🚫 You don’t have permission to use this.", ephemeral=True)
         await interaction.response.defer(ephemeral=True)
 
-        code = random.randint(100000, 999999)
-        pending_codes[user.id] = {
-            "code": code,
-            "timestamp": time.time(),
-            "dept": department.value,
-            "platform": platform.value,
-            "subdept": (subdept or "").upper() if department.value == "PSO" else "N/A",
-        }
+        subdept = (subdept or "").upper() if department.value == "PSO" else "N/A"
+        _, dm_ok = await issue_auth_code(user, department.value, platform.value, subdept, interaction.user.mention)
+        if not dm_ok:
+            await interaction.followup.send("⚠️ Couldn’t DM the applicant (DMs likely closed).", ephemeral=True)
+
+        await interaction.followup.send(f"✅ Code sent to {user.mention}'s DMs.", ephemeral=True)
+
+    except Exception as e:
+        await report_interaction_error(interaction, e, "auth_grant failed")
+
+# -------------------------
+# /auth_grant_bulk Command — Codes for Many Members
+# -------------------------
+def _batch_report(title: str, done: List[discord.abc.User], failed: List[discord.abc.User],
+                  notes: List[str] | None = None) -> str:
+    lines = [f"{title} — **{len(done)}** done"]
+    if failed:
+        lines.append(f"⚠️ DM failed for {len(failed)}: " + ", ".join(m.mention for m in failed))
+    lines += notes or []
+    return "\n".join(lines)[:1900]
+
+async def run_bulk_grant(interaction: discord.Interaction, members: List[discord.Member], dept: str, platform: str, subdept: str):
+    """Generate every code in one pass, fan the DMs out under a semaphore, log once."""
+    sem = asyncio.Semaphore(BULK_DM_CONCURRENCY)
+
+    async def grant(member: discord.Member):
+        async with sem:
+            return member, *await issue_auth_code(member, dept, platform, subdept, interaction.user.mention, log=False)
+
+    results = await asyncio.gather(*(grant(m) for m in members))
+    failed = [m for m, _, ok in results if not ok]
+
+    header = (
+        f"🔐 **Bulk Auth Codes Generated** — {len(results)} user(s)\n"
+        f"Department: `{dept}` | Platform: `{platform}` | Subdept: `{subdept}` | Granted by: {interaction.user.mention}\n"
+    )
+    lines = [f"• {m.mention} — **{code}**" + ("" if ok else " ⚠️ DM failed") for m, code, ok in results]
+    chunk = header
+    for line in lines:
+        if len(chunk) + len(line) > 3500:
+            log_event(AUTH_CODE_LOG_CHANNEL, chunk, priority=LOG_AUDIT)
+            chunk = ""
+        chunk += line + "\n"
+    log_event(AUTH_CODE_LOG_CHANNEL, chunk, priority=LOG_AUDIT)
+
+    await interaction.followup.send(_batch_report("🔐 Bulk auth codes", [m for m, _, ok in results if ok], failed), ephemeral=True)
+
+class BulkGrantView(SafeView):
+    """Ephemeral multi-user picker for /auth_grant_bulk when no role is given."""
+
+    def __init__(self, dept: str, platform: str, subdept: str):
+        super().__init__(timeout=300)
+        self.dept, self.platform, self.subdept = dept, platform, subdept
+        self.picker = discord.ui.UserSelect(placeholder="Select members to authorize…", min_values=1, max_values=25, row=0)
+        self.picker.callback = self._noop
+        self.add_item(self.picker)
+
+    async def _noop(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+
+    @discord.ui.button(label="Generate codes", style=discord.ButtonStyle.success, row=1)
+    async def confirm(self, interaction: discord.Interaction, button: discord.ui.Button):
+        members = [m for m in self.picker.values if isinstance(m, discord.Member) and not m.bot]
+        if not members:
+            return await interaction.response.send_message("Select at least one member first.", ephemeral=True)
+        self.stop()
+        await interaction.response.edit_message(content=f"⏳ Generating {len(members)} code(s)…", view=None)
+        await run_bulk_grant(interaction, members, self.dept, self.platform, self.subdept)
+
+@tree.command(name="auth_grant_bulk", description="Generate auth codes for several members at once.")
+@app_commands.describe(
+    department="Department (PSO / CO / SAFR)",
+    platform="Platform (PS4 / PS5 / XboxOG)",
+    subdept="Optional sub-department for PSO (SASP / BCSO)",
+    role="Grant everyone holding this role (otherwise pick members from a list)"
+)
+@app_commands.choices(department=[
+    app_commands.Choice(name="PSO", value="PSO"),
+    app_commands.Choice(name="CO", value="CO"),
+    app_commands.Choice(name="SAFR", value="SAFR"),
+])
+@app_commands.choices(platform=[
+    app_commands.Choice(name="PS4", value="PS4"),
+    app_commands.Choice(name="PS5", value="PS5"),
+    app_commands.Choice(name="XboxOG", value="XboxOG"),
+])
+async def auth_grant_bulk(
+    interaction: discord.Interaction,
+    department: app_commands.Choice[str],
+    platform: app_commands.Choice[str],
+    subdept: str | None = None,
+    role: discord.Role | None = None
+):
+    try:
+        if not is_staff(interaction):
+            return await interaction.response.send_message("🚫 You don’t have permission to use this.", ephemeral=True)
+        subdept = (subdept or "").upper() if department.value == "PSO" else "N/A"
+        if role is None:
+            return await interaction.response.send_message(
+                f"Pick who gets a `{department.value}` / `{platform.value}` code:",
+                view=BulkGrantView(department.value, platform.value, subdept), ephemeral=True
+            )
+        members = [m for m in role.members if not m.bot]
+        if not members:
+            return await interaction.response.send_message(f"Nobody holds {role.mention}.", ephemeral=True)
+        if len(members) > BULK_GRANT_MAX:
+            return await interaction.response.send_message(
+                f"{role.mention} has {len(members)} members — bulk grants are capped at {BULK_GRANT_MAX}.", ephemeral=True
+            )
+        await interaction.response.defer(ephemeral=True)
+        await run_bulk_grant(interaction, members, department.value, platform.value, subdept)
+    except Exception as e:
+        await report_interaction_error(interaction, e, "auth_grant_bulk failed")
 
-        # Log generation
-        if hq := bot.get_guild(HQ_GUILD_ID):
-            if log_ch := hq.get_channel(AUTH_CODE_LOG_CHANNEL):
-                await log_ch.send(
-                    f"🔐 **Auth Code Generated**\n"
-                    f"User: {user.mention} (`{user.id}`)\n"
-                    f"Department: `{department.value}` | Platform: `{platform.value}` | Subdept: `{pending_codes[user.id]['subdept']}`\n"
-                    f"Code: **{code}** (expires in 5 minutes)\n"
-                    f"Granted by: {interaction.user.mention}"
+# -------------------------
+# Accept → Access Pipeline
+# -------------------------
+# Grants scheduled for later live in checkpoint_store (expires_at = due time) so a restart
+# doesn't lose them; the scheduler issues everything due in one pass.
+AUTO_GRANT_MAX_SLEEP = 60
+
+pipeline_stats = {
+    "auto_grants": 0,
+    "auto_grant_dm_failed": 0,
+    "auto_grant_failed": 0,
+    "last_accept_to_code_s": 0.0,
+    "access_total": 0,
+    "last_submit_to_access_s": 0.0,
+    "max_submit_to_access_s": 0.0,
+}
+
+async def grant_after_accept(user_id: int, job: dict) -> Tuple[int | str, bool]:
+    """Issue the code for an accepted applicant. Unlogged jobs (batch review) leave the log to the caller."""
+    log = job.get("log", True)
+    user = bot.get_user(user_id) or await bot.fetch_user(user_id)
+    code, ok = await issue_auth_code(user, job["dept"], job["platform"], job["subdept"],
+                                     f"auto — accepted by <@{job['accepted_by']}>", log=log)
+    pipeline_stats["auto_grants"] += 1
+    pipeline_stats["last_accept_to_code_s"] = time.time() - job["accepted_at"]
+    if not ok:
+        pipeline_stats["auto_grant_dm_failed"] += 1
+        if log:
+            log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Auto-grant DM to <@{user_id}> failed — run /auth_grant once their DMs are open.", priority=LOG_ERROR)
+    return code, ok
+
+async def queue_auto_grant(user_id: int, dept: str, platform: str, subdept: str, accepted_by: int,
+                           *, log: bool = True) -> Tuple[int | str, bool] | None:
+    """Issue now, or schedule for later (returns None) when a delay or batch window applies."""
+    job = {"dept": dept, "platform": platform, "subdept": subdept, "accepted_by": accepted_by,
+           "accepted_at": time.time(), "log": log}
+    due = time.time() + AUTO_GRANT_DELAY_SECONDS
+    if AUTO_GRANT_BATCH_SECONDS:
+        due = -(-due // AUTO_GRANT_BATCH_SECONDS) * AUTO_GRANT_BATCH_SECONDS
+    if due <= time.time():
+        return await grant_after_accept(user_id, job)
+    await asyncio.to_thread(checkpoint_store.put, "auto_grants", user_id, job, ttl=due - time.time())
+    return None
+
+def _grant_line(user_id: int, dept: str, grant: Tuple[int | str, bool] | None) -> str:
+    """One applicant's line in a consolidated grant log."""
+    if grant is None:
+        return f"• <@{user_id}> — `{dept}` — code scheduled"
+    code, ok = grant
+    return f"• <@{user_id}> — `{dept}` — **{code}**" + ("" if ok else " ⚠️ DM failed")
+
+async def auto_grant_scheduler():
+    """Issue every delayed/batched grant that has come due."""
+    while True:
+        try:
+            due = await asyncio.to_thread(checkpoint_store.pop_expired, "auto_grants", time.time())
+            results = await asyncio.gather(*(grant_after_accept(int(key), job) for key, job, _ in due), return_exceptions=True)
+            batched = []  # grants from batch review, logged together below
+            for (key, job, _), result in zip(due, results):
+                # The job has already left the store — a failure here needs a manual grant
+                if isinstance(result, Exception):
+                    pipeline_stats["auto_grant_failed"] += 1
+                    log_event(
+                        AUTH_CODE_LOG_CHANNEL,
+                        f"⚠️ Auto-grant for <@{key}> (`{job['dept']}`) failed: `{result}` — run /auth_grant manually.",
+                        priority=LOG_ERROR,
+                    )
+                elif not job.get("log", True):
+                    batched.append(_grant_line(int(key), job["dept"], result))
+            if batched:
+                log_event(
+                    AUTH_CODE_LOG_CHANNEL,
+                    f"🔐 **Auth Codes Generated** — {len(batched)} batch-accepted applicant(s)\n" + "\n".join(batched),
+                    priority=LOG_AUDIT,
                 )
+            nxt = await asyncio.to_thread(checkpoint_store.next_expiry, "auto_grants")
+            delay = AUTO_GRANT_MAX_SLEEP if nxt is None else min(AUTO_GRANT_MAX_SLEEP, max(0.5, nxt - time.time()))
+        except Exception as e:
+            print("auto grant scheduler error:", e)
+            delay = AUTO_GRANT_MAX_SLEEP
+        await asyncio.sleep(delay)
 
-        # DM applicant
+async def record_access_timing(user_id: int, dept: str) -> float | None:
+    """Submission → guild access time for the success log and pipeline_stats."""
+    try:
+        submitted_at = await asyncio.to_thread(app_archive.mark_access, user_id, dept)
+    except sqlite3.Error:
+        return None
+    if submitted_at is None:
+        return None
+    elapsed = time.time() - submitted_at
+    pipeline_stats["access_total"] += 1
+    pipeline_stats["last_submit_to_access_s"] = elapsed
+    pipeline_stats["max_submit_to_access_s"] = max(pipeline_stats["max_submit_to_access_s"], elapsed)
+    return elapsed
+
+# -------------------------
+# Auth Code Expiry Sweeper
+# -------------------------
+CODE_SWEEP_MAX_SLEEP = 30  # seconds between sweeps when nothing is about to expire
+
+code_expiry_stats = {
+    "expired_total": 0,   # codes evicted by the sweeper
+    "last_lag_s": 0.0,    # how late the most recent eviction ran
+    "max_lag_s": 0.0,
+    "last_sweep_at": 0.0,
+}
+
+def pending_code_metrics() -> dict:
+    return {"size": state_store.count("pending_codes"), **code_expiry_stats}
+
+async def code_expiry_sweeper():
+    """Single task evicting expired auth codes, logging them in batches."""
+    while True:
         try:
-            e = Embed(
-                title="🔐 Grant Roleplay Network™ — Authorization",
-                description=(
-                    f"**Your one-time 6-digit code:** `{code}`\n"
-                    "Use this code on the verification page below. Once redeemed, it becomes invalid.\n\n"
-                    f"[Click here to Verify]({REDIRECT_URI})"
-                ),
-                color=GRN_COLOR
+            now = time.time()
+            expired = await asyncio.to_thread(state_store.pop_expired, "pending_codes", now)
+            await asyncio.to_thread(state_store.pop_expired, "auth_nonces", now)
+            code_expiry_stats["last_sweep_at"] = now
+            if expired:
+                lags = [now - exp for _, _, exp in expired]
+                code_expiry_stats["expired_total"] += len(expired)
+                code_expiry_stats["last_lag_s"] = max(lags)
+                code_expiry_stats["max_lag_s"] = max(code_expiry_stats["max_lag_s"], max(lags))
+                for uid, rec, _ in expired:
+                    log_event(AUTH_CODE_LOG_CHANNEL, f"⌛ Auth code expired unredeemed — <@{uid}> `{rec.get('dept')}` / `{rec.get('platform')}`")
+                if len(expired) >= 500:
+                    continue  # backlog — sweep again immediately
+
+            nxt = await asyncio.to_thread(state_store.next_expiry, "pending_codes")
+            delay = CODE_SWEEP_MAX_SLEEP if nxt is None else min(CODE_SWEEP_MAX_SLEEP, max(0.5, nxt - time.time()))
+        except Exception as e:
+            print("code expiry sweeper error:", e)
+            delay = CODE_SWEEP_MAX_SLEEP
+        await asyncio.sleep(delay)
+
+# -------------------------
+# Staff Application Controls
+# -------------------------
+def is_staff(interaction: discord.Interaction) -> bool:
+    return any(r.id == STAFF_CAN_POST_PANEL_ROLE for r in getattr(interaction.user, "roles", []))
+
+@tree.command(name="app_active", description="List applications currently in progress.")
+async def app_active(interaction: discord.Interaction):
+    if not is_staff(interaction):
+        return await interaction.response.send_message("🚫 You don’t have permission to use this.", ephemeral=True)
+    running = list_application_tasks()
+    if not running:
+        return await interaction.response.send_message("No applications in progress.", ephemeral=True)
+    lines = [
+        f"• <@{uid}> — `{app_sessions.get(uid, {}).get('dept', '?')}` — started <t:{int(started)}:R>"
+        for uid, started in running[:25]
+    ]
+    if len(running) > 25:
+        lines.append(f"…and {len(running) - 25} more")
+    if admission_queue:
+        lines.append(f"🕒 **{len(admission_queue)}** waiting in line (cap {MAX_ACTIVE_APPLICATIONS})")
+    await interaction.response.send_message(f"**{len(running)} active application(s)**\n" + "\n".join(lines), ephemeral=True)
+
+@tree.command(name="app_cancel", description="Cancel a user's in-progress application.")
+@app_commands.describe(user="The applicant whose application should be cancelled")
+async def app_cancel(interaction: discord.Interaction, user: discord.Member):
+    if not is_staff(interaction):
+        return await interaction.response.send_message("🚫 You don’t have permission to use this.", ephemeral=True)
+    if admission_queue.pop(user.id, None):
+        admission_stats["left_queue"] += 1
+        await interaction.response.send_message(f"🛑 Removed {user.mention} from the application queue.", ephemeral=True)
+    elif cancel_application_task(user.id):
+        await interaction.response.send_message(f"🛑 Cancelled {user.mention}'s application.", ephemeral=True)
+    else:
+        await interaction.response.send_message(f"{user.mention} has no application in progress.", ephemeral=True)
+
+class BatchReviewView(SafeView):
+    """Ephemeral backlog picker: decide several pending applications in one go."""
+
+    def __init__(self, pending: List[dict]):
+        super().__init__(timeout=600)
+        self.pending = {str(p["id"]): p for p in pending}
+        self.picker = discord.ui.Select(
+            placeholder="Select applications…", min_values=1, max_values=len(pending), row=0,
+            options=[
+                discord.SelectOption(
+                    label=f"#{p['id']} — {(bot.get_user(p['user_id']) or p['user_id'])}"[:100],
+                    description=f"{p['dept']} / {p['subdept']} / {p['platform']} — {readable_duration(time.time() - p['submitted_at'])} ago"[:100],
+                    value=str(p["id"]),
+                )
+                for p in pending
+            ],
+        )
+        self.picker.callback = self._noop
+        self.add_item(self.picker)
+
+    async def _noop(self, interaction: discord.Interaction):
+        await interaction.response.defer()
+
+    async def _decide(self, interaction: discord.Interaction, decision: str):
+        chosen = [self.pending[v] for v in self.picker.values]
+        if not chosen:
+            return await interaction.response.send_message("Select at least one application first.", ephemeral=True)
+        self.stop()
+        await interaction.response.edit_message(content=f"⏳ Processing {len(chosen)} application(s)…", view=None)
+
+        accepted = decision == "Accepted"
+        title = f"{'✅' if accepted else '❌'} Batch {decision.lower()}"
+
+        # The picker may be minutes old — skip anything decided from its card in the meantime
+        still_pending = await asyncio.to_thread(app_archive.undecided, [p["id"] for p in chosen])
+        skipped = [p for p in chosen if p["id"] not in still_pending]
+        chosen = [p for p in chosen if p["id"] in still_pending]
+        notes = ["⏭️ Already decided, skipped: " + ", ".join(f"<@{p['user_id']}>" for p in skipped)] if skipped else []
+        if not chosen:
+            return await interaction.followup.send(_batch_report(title, [], [], notes), ephemeral=True)
+
+        review_ch = bot.get_channel(APP_REVIEW_CHANNEL_ID)
+        sem = asyncio.Semaphore(BULK_DM_CONCURRENCY)
+
+        async def decide(p: dict):
+            async with sem:
+                applicant = bot.get_user(p["user_id"]) or await bot.fetch_user(p["user_id"])
+                grant = None
+                if accepted:
+                    ok = await accept_application(interaction.user, applicant, p["dept"], p["platform"], p["subdept"],
+                                                  log=False, auto_grant=False)
+                    if AUTO_GRANT_ON_ACCEPT:
+                        # Codes go into the batch summary instead of one auth log entry each
+                        try:
+                            grant = await queue_auto_grant(applicant.id, p["dept"], p["platform"], p["subdept"],
+                                                           interaction.user.id, log=False)
+                        except Exception as e:
+                            grant = e
+                else:
+                    ok = await deny_application(interaction.user, applicant, p["dept"], log=False)
+                if review_ch and p["review_message_id"]:
+                    try:
+                        await review_ch.get_partial_message(p["review_message_id"]).edit(
+                            view=review_view(p["user_id"], p["dept"], p["platform"], p["subdept"], disabled=True)
+                        )
+                    except discord.HTTPException:
+                        pass  # card deleted — the decision still stands
+                return applicant, ok, grant
+
+        results = await asyncio.gather(*(decide(p) for p in chosen), return_exceptions=True)
+        decided = [(r, p) for r, p in zip(results, chosen) if not isinstance(r, BaseException)]
+        errors = [(r, p) for r, p in zip(results, chosen) if isinstance(r, BaseException)]
+        done = [a for (a, ok, _), _ in decided if ok]
+        failed = [a for (a, ok, _), _ in decided if not ok]
+        notes += [f"❗ <@{p['user_id']}> (#{p['id']}) not decided: `{e}`" for e, p in errors]
+        if not decided:
+            return await interaction.followup.send(_batch_report(title, [], [], notes), ephemeral=True)
+
+        def line(applicant: discord.abc.User, p: dict, grant) -> str:
+            if not (accepted and AUTO_GRANT_ON_ACCEPT):
+                return f"• {applicant.mention} — `{p['dept']}`"
+            if isinstance(grant, Exception):
+                return f"• {applicant.mention} — `{p['dept']}` — ⚠️ code not issued (`{grant}`), run /auth_grant"
+            return _grant_line(applicant.id, p["dept"], grant)
+
+        log_event(DECISION_LOG_CHANNEL, embed=Embed(
+            title=f"📋 Batch Decision — {decision} ({len(decided)})",
+            color=GRN_COLOR if accepted else discord.Color.red(),
+            description=(
+                "\n".join(line(a, p, grant) for (a, _, grant), p in decided)[:3500]
+                + f"\n\n**Staff Member:** {interaction.user.mention}\n**Decision Time:** <t:{int(time.time())}:f>"
             )
-            e.set_image(url=ACCEPT_GIF_URL)
-            e.set_footer(text=FOOTER_TEXT)
-            v = SafeView()
-            v.add_item(discord.ui.Button(label="Open Verification", url=REDIRECT_URI, style=discord.ButtonStyle.link))
-            await user.send(embed=e, view=v)
-        except Exception:
-            await interaction.followup.send("⚠️ Couldn’t DM the applicant (DMs likely closed).", ephemeral=True)
+        ).set_footer(text=FOOTER_TEXT), priority=LOG_AUDIT)
+        await interaction.followup.send(_batch_report(title, done, failed, notes), ephemeral=True)
+
+    @discord.ui.button(label="✅ Accept selected", style=discord.ButtonStyle.success, row=1)
+    async def accept_selected(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._decide(interaction, "Accepted")
+
+    @discord.ui.button(label="❌ Deny selected", style=discord.ButtonStyle.danger, row=1)
+    async def deny_selected(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._decide(interaction, "Denied")
+
+@tree.command(name="app_review_batch", description="Accept or deny several pending applications at once.")
+async def app_review_batch(interaction: discord.Interaction):
+    if not is_staff(interaction):
+        return await interaction.response.send_message("🚫 You don’t have permission to use this.", ephemeral=True)
+    pending = await asyncio.to_thread(app_archive.pending, 25)
+    if not pending:
+        return await interaction.response.send_message("No applications awaiting review.", ephemeral=True)
+    await interaction.response.send_message(
+        f"**{len(pending)} oldest pending application(s)** — select and decide:", view=BatchReviewView(pending), ephemeral=True
+    )
 
-        await interaction.followup.send(f"✅ Code sent to {user.mention}'s DMs.", ephemeral=True)
+@tree.command(name="app_search", description="Search archived applications.")
+@app_commands.describe(
+    user="Only applications from this user",
+    department="Only this department",
+    platform="Only this platform",
+    since="Submitted on/after (YYYY-MM-DD)",
+    until="Submitted before (YYYY-MM-DD)",
+    query="Words to find in the answers",
+    page="Result page (5 per page)"
+)
+@app_commands.choices(department=[
+    app_commands.Choice(name="PSO", value="PSO"),
+    app_commands.Choice(name="CO", value="CO"),
+    app_commands.Choice(name="SAFR", value="SAFR"),
+])
+@app_commands.choices(platform=[
+    app_commands.Choice(name="PS4", value="PS4"),
+    app_commands.Choice(name="PS5", value="PS5"),
+    app_commands.Choice(name="XboxOG", value="XboxOG"),
+])
+async def app_search(
+    interaction: discord.Interaction,
+    user: discord.User | None = None,
+    department: app_commands.Choice[str] | None = None,
+    platform: app_commands.Choice[str] | None = None,
+    since: str | None = None,
+    until: str | None = None,
+    query: str | None = None,
+    page: app_commands.Range[int, 1] = 1
+):
+    if not is_staff(interaction):
+        return await interaction.response.send_message("🚫 You don’t have permission to use this.", ephemeral=True)
+    try:
+        bounds = [time.mktime(time.strptime(d, "%Y-%m-%d")) if d else None for d in (since, until)]
+    except ValueError:
+        return await interaction.response.send_message("❌ Dates must look like `2025-01-31`.", ephemeral=True)
 
-    except Exception as e:
-        await report_interaction_error(interaction, e, "auth_grant failed")
+    try:
+        rows, total = await asyncio.to_thread(
+            app_archive.search,
+            user_id=user.id if user else None,
+            dept=department.value if department else None,
+            platform=platform.value if platform else None,
+            since=bounds[0], until=bounds[1], text=query,
+            offset=(page - 1) * ARCHIVE_PAGE_SIZE,
+        )
+    except sqlite3.Error:
+        return await interaction.response.send_message("❌ Invalid search query — use plain words.", ephemeral=True)
+    if not rows:
+        return await interaction.response.send_message("No archived applications match.", ephemeral=True)
+
+    pages = -(-total // ARCHIVE_PAGE_SIZE)
+    e = Embed(title=f"🗂️ Application Archive — {total} match(es)", color=GRN_COLOR)
+    for r in rows:
+        decision = f"{r['decision']} by <@{r['decided_by']}>" if r["decision"] else "Pending"
+        value = f"<@{r['user_id']}> • `{r['platform']}` • <t:{int(r['submitted_at'])}:f>\n**{decision}**"
+        if r["snippet"]:
+            value += f"\n> {r['snippet'][:300]}"
+        e.add_field(name=f"#{r['id']} — {r['dept']} / {r['subdept']}", value=value[:1024], inline=False)
+    e.set_footer(text=f"Page {page}/{pages} • {FOOTER_TEXT}")
+    await interaction.response.send_message(embed=e, ephemeral=True)
 
 # =====================================================
 # Section 5+ — Full Web Auth (Glassmorphism + OAuth2 Auto-Join)
 # =====================================================
 
+# -------------------------
+# Discord REST Client (web tier)
+# -------------------------
+DISCORD_API_BASE = "https://discord.com/api"
+
+class DiscordRESTClient:
+    """Keep-alive requests.Session with per-route rate-limit buckets and 429 retries."""
+
+    def __init__(self, base_url: str = DISCORD_API_BASE, *, pool_size: int = 20,
+                 max_retries: int = 3, timeout: float = 15):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self._lock = threading.Lock()
+        self._route_buckets: Dict[str, str] = {}  # route key → X-RateLimit-Bucket hash
+        self._buckets: Dict[str, dict] = {}       # bucket hash → {"remaining", "reset_at"}
+        self._global_reset = 0.0
+        self.metrics: Dict[str, dict] = {}        # route key → counters + timings
+
+    @staticmethod
+    def _route_key(method: str, route: str, params: dict) -> str:
+        # Discord buckets per major parameter (guild/channel), not per user
+        major = params.get("guild_id") or params.get("channel_id") or ""
+        return f"{method} {route}:{major}"
+
+    def _delay_for(self, key: str) -> float:
+        now = time.time()
+        with self._lock:
+            delay = self._global_reset - now
+            bucket = self._buckets.get(self._route_buckets.get(key, ""))
+            if bucket and bucket["remaining"] <= 0:
+                delay = max(delay, bucket["reset_at"] - now)
+        return max(0.0, delay)
+
+    def _update_bucket(self, key: str, headers) -> None:
+        bucket = headers.get("X-RateLimit-Bucket")
+        if not bucket:
+            return
+        try:
+            remaining = int(headers.get("X-RateLimit-Remaining", "1"))
+            reset_after = float(headers.get("X-RateLimit-Reset-After", "0"))
+        except ValueError:
+            return
+        with self._lock:
+            self._route_buckets[key] = bucket
+            self._buckets[bucket] = {"remaining": remaining, "reset_at": time.time() + reset_after}
+
+    def _record(self, key: str, status: int | None, elapsed: float) -> None:
+        with self._lock:
+            m = self.metrics.setdefault(key, {"count": 0, "errors": 0, "rate_limited": 0, "total_s": 0.0, "max_s": 0.0})
+            m["count"] += 1
+            m["total_s"] += elapsed
+            m["max_s"] = max(m["max_s"], elapsed)
+            if status == 429:
+                m["rate_limited"] += 1
+            elif status is None or status >= 400:
+                m["errors"] += 1
+
+    def request(self, method: str, route: str, **kwargs) -> requests.Response:
+        """Send `method route` (route uses {placeholders} filled from `params`)."""
+        params = kwargs.pop("params", {})
+        key = self._route_key(method, route, params)
+        url = self.base_url + route.format(**params)
+        kwargs.setdefault("timeout", self.timeout)
+
+        for attempt in range(self.max_retries + 1):
+            if delay := self._delay_for(key):
+                time.sleep(delay)
+            t = time.perf_counter()
+            try:
+                resp = self.session.request(method, url, **kwargs)
+            except requests.RequestException:
+                self._record(key, None, time.perf_counter() - t)
+                if attempt >= self.max_retries:
+                    raise
+                time.sleep(min(8.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.25))
+                continue
+            self._record(key, resp.status_code, time.perf_counter() - t)
+            self._update_bucket(key, resp.headers)
+
+            if resp.status_code == 429 and attempt < self.max_retries:
+                try:
+                    retry_after = float(resp.headers.get("Retry-After") or resp.json().get("retry_after", 1))
+                except ValueError:
+                    retry_after = 1.0
+                if resp.headers.get("X-RateLimit-Global"):
+                    with self._lock:
+                        self._global_reset = time.time() + retry_after
+                time.sleep(retry_after + random.uniform(0, 0.1 + retry_after * 0.25))
+                continue
+            if resp.status_code in (502, 503, 504) and attempt < self.max_retries:
+                time.sleep(min(8.0, 0.5 * 2 ** attempt) + random.uniform(0, 0.25))
+                continue
+            return resp
+        return resp
+
+    def stats(self) -> Dict[str, dict]:
+        with self._lock:
+            return {
+                k: {**m, "avg_ms": round(m["total_s"] / m["count"] * 1000, 1) if m["count"] else 0.0}
+                for k, m in self.metrics.items()
+            }
+
+discord_rest = DiscordRESTClient()
+
+RATE_LIMITED_HTML = "<h3>⏳ Discord is busy right now. Please wait a minute and submit your code again.</h3>"
+
 flask_app = Flask(__name__)
 
 @flask_app.route("/")
 def health():
     return "✅ Grant Roleplay Network™ Auth Service is running."
 
+# -------------------------
+# /metrics (Prometheus)
+# -------------------------
+METRICS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+def _fmt_labels(labels) -> str:
+    labels = list(labels.items() if isinstance(labels, dict) else labels)
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"' for k, v in labels) + "}"
+
+def _loop_gauges() -> List[Tuple[str, str, str, dict, float]]:
+    """Gauges over state the bot loop mutates — run on that loop, never from a Flask thread."""
+    admission = admission_metrics()
+    roles = role_queue_metrics()
+    outbound = outbound_metrics()
+    with log_lock:
+        buffered = sum(len(b) for b in log_buffers.values())
+        sink = dict(log_sink_stats)
+    out = [
+        ("grn_app_sessions", "gauge", "Application sessions held in this process.", {}, len(app_sessions)),
+        ("grn_applications_active", "gauge", "Running application flows.", {}, admission["active"]),
+        ("grn_applications_cap", "gauge", "Concurrent application flows allowed.", {}, admission["cap"]),
+        ("grn_admission_queue_length", "gauge", "Users waiting for an application slot.", {}, admission["queue_length"]),
+        ("grn_admission_wait_seconds_avg", "gauge", "Average wait of users admitted from the queue.", {}, admission["avg_wait_s"]),
+        ("grn_admission_wait_seconds_max", "gauge", "Longest admission wait so far.", {}, admission["max_wait_s"]),
+        ("grn_role_queue_depth", "gauge", "Queued role edits.", {}, sum(roles["depth"].values())),
+        ("grn_role_dead_letters", "gauge", "Role edits that exhausted their retries (most recent kept).", {}, roles["dead_letters"]),
+        ("grn_log_sink_buffered", "gauge", "Staff log entries waiting to flush.", {}, buffered),
+        ("grn_pipeline_submit_to_access_seconds_last", "gauge", "Submission → guild access time of the latest verification.", {}, pipeline_stats["last_submit_to_access_s"]),
+    ]
+    if bot.is_ready():
+        out.append(("grn_gateway_latency_seconds", "gauge", "Discord gateway heartbeat latency.", {}, bot.latency))
+    for outcome in ("done", "retried", "dead"):
+        out.append(("grn_role_ops_total", "counter", "Role edits by outcome.", {"outcome": outcome}, roles[outcome]))
+    for name, m in outbound.items():
+        out.append(("grn_outbound_queued", "gauge", "Outbound sends waiting per class.", {"cls": name}, m["queued"]))
+        out.append(("grn_outbound_inflight", "gauge", "Outbound sends in flight per class.", {"cls": name}, m["inflight"]))
+        for result in ("sent", "failed"):
+            out.append(("grn_outbound_total", "counter", "Outbound sends by class and result.", {"cls": name, "result": result}, m[result]))
+    for result in ("sent", "dropped", "coalesced", "failed"):
+        out.append(("grn_log_sink_total", "counter", "Staff log sink entries by result.", {"result": result}, sink[result]))
+    for (guild_id, prefix), pool in callsign_pools.items():
+        out.append(("grn_callsigns_free", "gauge", "Unallocated callsign numbers.", {"guild": guild_id, "prefix": prefix}, pool.free()))
+    return out
+
+async def _collect_loop_gauges() -> List[Tuple[str, str, str, dict, float]]:
+    return _loop_gauges()
+
+def _scrape_gauges() -> List[Tuple[str, str, str, dict, float]]:
+    """(name, type, help, labels, value) read from the stats the bot already keeps."""
+    try:
+        on_bot_loop = BOT_IN_PROCESS and bot.loop.is_running()
+    except AttributeError:
+        on_bot_loop = False  # client not started yet (discord.py's loop sentinel)
+    if on_bot_loop:
+        out = asyncio.run_coroutine_threadsafe(_collect_loop_gauges(), bot.loop).result(timeout=5)
+    else:
+        out = _loop_gauges()  # no bot loop in this process — nothing mutates these concurrently
+    try:
+        codes = pending_code_metrics()
+        out.append(("grn_pending_codes", "gauge", "Unredeemed auth codes in the state store.", {}, codes["size"]))
+        out.append(("grn_pending_codes_expired_total", "counter", "Auth codes that expired unredeemed.", {}, codes["expired_total"]))
+    except Exception:
+        pass  # state backend unreachable — still serve everything else
+    for route, m in discord_rest.stats().items():
+        out.append(("grn_discord_rest_requests_total", "counter", "Web-tier Discord REST calls.", {"route": route}, m["count"]))
+        out.append(("grn_discord_429_total", "counter", METRIC_HELP["grn_discord_429_total"][1], {"source": "rest", "route": route}, m["rate_limited"]))
+    return out
+
+def metrics_allowed(remote: str | None, authorization: str | None) -> bool:
+    if METRICS_TOKEN:
+        return hmac.compare_digest(authorization or "", f"Bearer {METRICS_TOKEN}")
+    return remote in ("127.0.0.1", "::1")
+
+def render_metrics() -> str:
+    # Samples are grouped per family so a name fed from several sources stays contiguous
+    families: Dict[str, Tuple[str, str, List[str]]] = {}
+
+    def family(name: str, kind: str, help_text: str) -> List[str]:
+        return families.setdefault(name, (kind, help_text, []))[2]
+
+    with metrics_lock:
+        counters = sorted(metric_counters.items())
+        histograms = [(k, h.buckets, list(h.counts), h.sum) for k, h in sorted(metric_histograms.items(), key=lambda kv: kv[0])]
+
+    for (name, labels), value in counters:
+        family(name, *METRIC_HELP.get(name, ("counter", name))).append(f"{name}{_fmt_labels(labels)} {value}")
+    for name, kind, help_text, labels, value in _scrape_gauges():
+        family(name, kind, help_text).append(f"{name}{_fmt_labels(labels)} {value}")
+    for (name, labels), buckets, counts, total in histograms:
+        out = family(name, *METRIC_HELP.get(name, ("histogram", name)))
+        running = 0
+        for bound, n in zip((*buckets, "+Inf"), counts):
+            running += n
+            out.append(f"{name}_bucket{_fmt_labels((*labels, ('le', bound)))} {running}")
+        out.append(f"{name}_sum{_fmt_labels(labels)} {total}")
+        out.append(f"{name}_count{_fmt_labels(labels)} {running}")
+
+    lines: List[str] = []
+    for name in sorted(families):
+        kind, help_text, samples = families[name]
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", *samples]
+    return "\n".join(lines) + "\n"
+
+@flask_app.route("/metrics")
+def metrics():
+    if not metrics_allowed(request.remote_addr, request.headers.get("Authorization")):
+        return "Forbidden", 403
+    return render_metrics(), 200, {"Content-Type": METRICS_CONTENT_TYPE}
+
+@flask_app.after_request
+def count_response(resp):
+    if request.endpoint in ("oauth_handler", "health"):
+        inc("grn_http_responses_total", path=request.path, status=str(resp.status_code))
+    return resp
+
 # -------------------------
 # Glassmorphic HTML Page
 # -------------------------
@@ -962,6 +3409,222 @@ function transitionSuccess() {
 </html>
 """
 
+# -------------------------
+# Shared Verification Steps (Flask + aiohttp)
+# -------------------------
+def oauth_authorize_url(state: str | None = None) -> str:
+    params = {
+        "client_id": CLIENT_ID,
+        "response_type": "code",
+        "redirect_uri": REDIRECT_URI,
+        "scope": "identify guilds.join"
+    }
+    if state:
+        params["state"] = state  # signed grant token rides through OAuth and back
+    return "https://discord.com/oauth2/authorize?" + urllib.parse.urlencode(params)
+
+# -------------------------
+# Signed Grant Tokens (AUTH_CODE_MODE=signed)
+# -------------------------
+def _b64(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+def _unb64(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + "=" * (-len(data) % 4))
+
+def _sign(payload: bytes, purpose: bytes) -> bytes:
+    return hmac.new(AUTH_SIGNING_KEY, purpose + payload, hashlib.sha256).digest()
+
+def _token_pin(payload: bytes) -> str:
+    return f"{int.from_bytes(_sign(payload, b'pin:')[:8], 'big') % 1_000_000:06d}"
+
+def issue_signed_token(user_id: int, dept: str, platform: str, subdept: str) -> tuple[str, str]:
+    """Return (token for the verification link, 6-digit PIN for the DM)."""
+    expires = int(time.time() + CODE_TTL_SECONDS)
+    payload = f"{user_id}|{dept}|{platform}|{subdept}|{expires}|{secrets.token_hex(6)}".encode()
+    return f"{_b64(payload)}.{_b64(_sign(payload, b'tok:')[:16])}", _token_pin(payload)
+
+def verify_signed_token(token: str, user_id: int, pin: str) -> tuple[dict | None, str | None]:
+    """Constant-time check of a signed grant; returns a pending-code shaped record."""
+    invalid = "<h3>❌ This verification link is invalid. Ask staff to run /auth_grant again.</h3>"
+    try:
+        payload_b64, sig_b64 = token.split(".", 1)
+        payload, sig = _unb64(payload_b64), _unb64(sig_b64)
+    except ValueError:
+        return None, invalid
+    if not hmac.compare_digest(sig, _sign(payload, b"tok:")[:16]):
+        return None, invalid
+    try:
+        uid, dept, platform, subdept, expires, nonce = payload.decode().split("|")
+    except ValueError:
+        return None, invalid
+    if int(uid) != user_id:
+        return None, "<h3>❌ This verification link belongs to another Discord account.</h3>"
+    if time.time() > int(expires):
+        return None, "<h3>❌ Code expired. Ask staff to generate a new one.</h3>"
+    if not hmac.compare_digest(pin, _token_pin(payload)):
+        return None, "<h3>❌ Invalid code. Please try again.</h3>"
+    return {
+        "code": pin,
+        "timestamp": int(expires) - CODE_TTL_SECONDS,
+        "dept": dept,
+        "platform": platform,
+        "subdept": subdept,
+        "nonce": nonce,
+    }, None
+
+def oauth_token_form(code: str | None) -> dict:
+    return {
+        "client_id": CLIENT_ID,
+        "client_secret": CLIENT_SECRET,
+        "grant_type": "authorization_code",
+        "code": code,
+        "redirect_uri": REDIRECT_URI,
+    }
+
+def check_pending(user_id: int, pin: str, token: str | None = None) -> tuple[dict | None, str | None]:
+    """Return (pending record, None) if the pin is valid, else (None, error html)."""
+    if AUTH_CODE_MODE == "signed":
+        if not token:
+            return None, "<h3>❌ This verification link is invalid. Ask staff to run /auth_grant again.</h3>"
+        return verify_signed_token(token, user_id, pin)
+    pdata = state_store.get("pending_codes", user_id)
+    if not pdata:
+        return None, "<h3>❌ No active authorization found. Ask staff to run /auth_grant again.</h3>"
+    if time.time() - float(pdata["timestamp"]) > CODE_TTL_SECONDS:
+        state_store.delete("pending_codes", user_id)
+        return None, "<h3>❌ Code expired. Ask staff to generate a new one.</h3>"
+    if pin != str(pdata["code"]):
+        return None, "<h3>❌ Invalid code. Please try again.</h3>"
+    return pdata, None
+
+def redeem_code(user_id: int, pdata: dict) -> bool:
+    """Consume the validated code exactly once across all workers."""
+    if nonce := pdata.get("nonce"):
+        # Signed grant: remember the nonce until the token would expire anyway
+        ttl = max(1.0, pdata["timestamp"] + CODE_TTL_SECONDS - time.time())
+        return state_store.add("auth_nonces", nonce, {"user_id": user_id}, ttl=ttl)
+    taken = state_store.take("pending_codes", user_id)
+    if taken is None:
+        return False
+    if taken.get("code") != pdata.get("code"):
+        # Staff re-granted in between — keep the newer code alive
+        restore_code(user_id, taken)
+        return False
+    return True
+
+def restore_code(user_id: int, pdata: dict) -> None:
+    """Give the code back after a failed join so the user can retry."""
+    if nonce := pdata.get("nonce"):
+        state_store.delete("auth_nonces", nonce)
+        return
+    remaining = CODE_TTL_SECONDS - (time.time() - float(pdata["timestamp"]))
+    if remaining > 0:
+        state_store.put("pending_codes", user_id, pdata, ttl=remaining)
+
+ALREADY_REDEEMED_HTML = "<h3>❌ This code has already been used.</h3>"
+JOIN_UNREACHABLE_HTML = "<h3>⚠️ We couldn’t reach Discord to add you to the server. Your code is still valid — please try again.</h3>"
+
+def build_join_body(access_token: str, pdata: dict, user_id: int, username: str) -> dict:
+    """Add-guild-member payload carrying the starter roles + callsign."""
+    platform, dept = pdata["platform"], pdata["dept"]
+    body: dict = {"access_token": access_token}
+    if plan_roles := planned_platform_roles(platform, dept, pdata.get("subdept", "N/A")):
+        body["roles"] = [str(rid) for rid in plan_roles]
+    guild_id = PLATFORM_GUILDS.get(platform, 0)
+    if role_plan_key(platform, dept, pdata.get("subdept")) in ROLE_PLAN and (nick := initial_callsign(dept, username, guild_id, user_id)):
+        body["nick"] = nick
+    return body
+
+async def apply_verified_member(user_id: int, pdata: dict, joined_with_plan: bool, stages: Dict[str, float]) -> bool:
+    """HQ role swap + (if needed) platform roles, success log and DM. Returns success."""
+    platform = pdata["platform"]
+    dept = pdata["dept"]
+    subdept = pdata.get("subdept", "N/A")
+    target_guild_id = PLATFORM_GUILDS.get(platform)
+    ok = True
+    try:
+        t = time.perf_counter()
+        hq = bot.get_guild(HQ_GUILD_ID)
+
+        # HQ Role Swap — one PATCH with the final role set
+        if hq:
+            hm = hq.get_member(user_id) or await hq.fetch_member(user_id)
+            if hm:
+                drop = {ROLE_PENDING, ROLE_VERIFIED}
+                add = {rid for rid in (ACCEPTED_PLATFORM_ROLES.get(platform), ROLE_OFFICIAL) if rid and hq.get_role(rid)}
+                current = {r.id for r in hm.roles if not r.is_default()}
+                final = (current - drop) | add
+                if final != current:
+                    try:
+                        await run_role_op(
+                            HQ_GUILD_ID, f"HQ role swap for <@{user_id}>",
+                            lambda: hm.edit(roles=[Object(id=rid) for rid in final], reason="Application accepted"),
+                        )
+                    except Exception:
+                        ok = False  # reported by the dead-letter log
+            stages["hq_swap"], t = time.perf_counter() - t, time.perf_counter()
+
+        # Department assignment (already done by the join PUT for new members)
+        if not joined_with_plan:
+            g = bot.get_guild(target_guild_id)
+            m = g and (g.get_member(user_id) or await g.fetch_member(user_id))
+            if m and not await apply_role_plan(m, platform, dept, subdept):
+                ok = False
+            stages["dept_roles"], t = time.perf_counter() - t, time.perf_counter()
+
+        # Success log
+        for stage, seconds in stages.items():
+            observe("grn_oauth_stage_seconds", seconds, stage=stage)
+        e2e = await record_access_timing(user_id, dept)
+        log_event(
+            AUTH_CODE_LOG_CHANNEL,
+            f"✅ **Auth Success** — <@{user_id}> | `{dept}` | `{subdept}` | `{platform}`\n⏱ {format_stages(stages)}"
+            + (f" | submission → access **{readable_duration(e2e)}**" if e2e is not None else ""),
+            priority=LOG_AUDIT,
+        )
+
+        # DM user confirmation
+        try:
+            user = await bot.fetch_user(user_id)
+            e = Embed(
+                title="✅ Verification Complete",
+                description="Welcome to **Grant Roleplay Network™** — your access has been granted.",
+                color=GRN_COLOR
+            ).set_footer(text=FOOTER_TEXT)
+            await send_outbound(OUT_DECISION, user_id, lambda: user.send(embed=e))
+        except Exception:
+            pass
+        return ok
+
+    except Exception as e:
+        print("apply roles error:", e)
+        return False
+
+# -------------------------
+# Role Job Handoff (web worker → bot)
+# -------------------------
+BOT_IN_PROCESS = False  # set by __main__ when the Discord client runs in this interpreter
+
+def dispatch_role_job(user_id: int, pdata: dict, joined_with_plan: bool, stages: Dict[str, float]) -> None:
+    """Schedule post-join role assignment on the bot, wherever it runs."""
+    if BOT_IN_PROCESS:
+        asyncio.run_coroutine_threadsafe(apply_verified_member(user_id, pdata, joined_with_plan, stages), bot.loop)
+    else:
+        state_store.put("role_jobs", user_id, {"pdata": pdata, "joined_with_plan": joined_with_plan, "stages": stages})
+
+async def role_job_worker(interval: float = 2.0):
+    """Bot-side poller for jobs queued by out-of-process web workers."""
+    while True:
+        try:
+            for key, _ in await asyncio.to_thread(state_store.items, "role_jobs"):
+                job = await asyncio.to_thread(state_store.take, "role_jobs", key)
+                if job:
+                    await apply_verified_member(int(key), job["pdata"], job["joined_with_plan"], job["stages"])
+        except Exception as e:
+            print("role job worker error:", e)
+        await asyncio.sleep(interval)
+
 # -------------------------
 # OAuth2 + Join Flow
 # -------------------------
@@ -969,16 +3632,7 @@ function transitionSuccess() {
 def oauth_handler():
     # First-time visit → redirect to Discord OAuth
     if request.method == "GET" and not request.args.get("code"):
-        auth_url = (
-            "https://discord.com/oauth2/authorize?"
-            + urllib.parse.urlencode({
-                "client_id": CLIENT_ID,
-                "response_type": "code",
-                "redirect_uri": REDIRECT_URI,
-                "scope": "identify guilds.join"
-            })
-        )
-        return redirect(auth_url, code=302)
+        return redirect(oauth_authorize_url(request.args.get("t")), code=302)
 
     # Render external HTML template (auth.html)
     if request.method == "GET":
@@ -990,21 +3644,20 @@ def oauth_handler():
     if not pin.isdigit():
         return "<h3>❌ Invalid code format.</h3>", 400
 
+    stages: Dict[str, float] = {}
+    t = time.perf_counter()
+
     # -------------------------
     # Token Exchange
     # -------------------------
-    token_resp = requests.post(
-        "https://discord.com/api/oauth2/token",
-        data={
-            "client_id": CLIENT_ID,
-            "client_secret": CLIENT_SECRET,
-            "grant_type": "authorization_code",
-            "code": code,
-            "redirect_uri": REDIRECT_URI,
-        },
+    token_resp = discord_rest.request(
+        "POST", "/oauth2/token",
+        data=oauth_token_form(code),
         headers={"Content-Type": "application/x-www-form-urlencoded"},
-        timeout=15,
     )
+    stages["token"], t = time.perf_counter() - t, time.perf_counter()
+    if token_resp.status_code == 429:
+        return RATE_LIMITED_HTML, 429
     if token_resp.status_code != 200:
         return f"<h3>❌ Token exchange failed:</h3><pre>{token_resp.text}</pre>", 400
     access_token = token_resp.json().get("access_token")
@@ -1014,127 +3667,226 @@ def oauth_handler():
     # -------------------------
     # Identify User
     # -------------------------
-    me = requests.get(
-        "https://discord.com/api/users/@me",
+    me = discord_rest.request(
+        "GET", "/users/@me",
         headers={"Authorization": f"Bearer {access_token}"},
-        timeout=15,
     )
+    stages["identify"], t = time.perf_counter() - t, time.perf_counter()
+    if me.status_code == 429:
+        return RATE_LIMITED_HTML, 429
     if me.status_code != 200:
         return f"<h3>❌ User fetch failed:</h3><pre>{me.text}</pre>", 400
-    user_id = int(me.json()["id"])
+    me_json = me.json()
+    user_id = int(me_json["id"])
 
-    pdata = pending_codes.get(user_id)
-    if not pdata:
-        return "<h3>❌ No active authorization found. Ask staff to run /auth_grant again.</h3>", 400
-    if time.time() - float(pdata["timestamp"]) > CODE_TTL_SECONDS:
-        pending_codes.pop(user_id, None)
-        return "<h3>❌ Code expired. Ask staff to generate a new one.</h3>", 400
-    if pin != str(pdata["code"]):
-        return "<h3>❌ Invalid code. Please try again.</h3>", 400
+    pdata, error = check_pending(user_id, pin, request.args.get("state"))
+    if error:
+        return error, 400
 
     # -------------------------
-    # Auto-Join Target Guild
+    # Auto-Join Target Guild (roles + callsign in the same PUT)
     # -------------------------
-    platform = pdata["platform"]
-    target_guild_id = PLATFORM_GUILDS.get(platform)
+    target_guild_id = PLATFORM_GUILDS.get(pdata["platform"])
     if not target_guild_id:
         return "<h3>❌ Platform guild not configured.</h3>", 500
+    if not redeem_code(user_id, pdata):
+        return ALREADY_REDEEMED_HTML, 409
 
-    put_resp = requests.put(
-        f"https://discord.com/api/guilds/{target_guild_id}/members/{user_id}",
-        headers={
-            "Authorization": f"Bot {BOT_TOKEN}",
-            "Content-Type": "application/json",
-        },
-        json={"access_token": access_token},
-        timeout=15,
-    )
+    # The code is already taken — every failure from here on has to give it back
+    try:
+        join_body = build_join_body(access_token, pdata, user_id, me_json.get("username", ""))
+        put_resp = discord_rest.request(
+            "PUT", "/guilds/{guild_id}/members/{user_id}",
+            params={"guild_id": target_guild_id, "user_id": user_id},
+            headers={"Authorization": f"Bot {BOT_TOKEN}"},
+            json=join_body,
+        )
+    except Exception as e:
+        restore_code(user_id, pdata)
+        log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Guild join request failed for <@{user_id}>: `{e}`", priority=LOG_ERROR)
+        return JOIN_UNREACHABLE_HTML, 502
+    stages["join"], t = time.perf_counter() - t, time.perf_counter()
+    if put_resp.status_code == 429:
+        restore_code(user_id, pdata)
+        return RATE_LIMITED_HTML, 429
     if put_resp.status_code not in (200, 201, 204):
         if not (put_resp.status_code == 400 and "already" in put_resp.text.lower()):
+            restore_code(user_id, pdata)
             return f"<h3>❌ Guild join failed ({put_resp.status_code}):</h3><pre>{put_resp.text}</pre>", 400
 
+    # 201 → joined with the planned roles/nick; 204 → already a member (plan not applied).
+    # Without a nick (callsigns not indexed in this process) the bot still has to finish the plan.
+    joined_with_plan = put_resp.status_code == 201 and "nick" in join_body
+
     # -------------------------
-    # Verify Join + Apply Roles
+    # Verify Join (only when the PUT response doesn't prove membership)
     # -------------------------
-    verify = requests.get(
-        f"https://discord.com/api/guilds/{target_guild_id}/members/{user_id}",
-        headers={"Authorization": f"Bot {BOT_TOKEN}"},
-        timeout=15,
-    )
-    if verify.status_code != 200:
+    if put_resp.status_code not in (201, 204):
         try:
-            hq = bot.get_guild(HQ_GUILD_ID)
-            if ch := hq.get_channel(AUTH_CODE_LOG_CHANNEL):
-                asyncio.run_coroutine_threadsafe(
-                    ch.send(f"⚠️ Join verify failed for <@{user_id}> | {verify.status_code} {verify.text[:800]}"),
-                    bot.loop
-                )
-        except Exception:
-            pass
-        return "<h3>⚠️ Join verification failed.</h3>", 400
+            verify = discord_rest.request(
+                "GET", "/guilds/{guild_id}/members/{user_id}",
+                params={"guild_id": target_guild_id, "user_id": user_id},
+                headers={"Authorization": f"Bot {BOT_TOKEN}"},
+            )
+        except Exception as e:
+            restore_code(user_id, pdata)
+            log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Join verify request failed for <@{user_id}>: `{e}`", priority=LOG_ERROR)
+            return JOIN_UNREACHABLE_HTML, 502
+        stages["verify"], t = time.perf_counter() - t, time.perf_counter()
+        if verify.status_code != 200:
+            restore_code(user_id, pdata)
+            log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Join verify failed for <@{user_id}> | {verify.status_code} {verify.text[:800]}", priority=LOG_ERROR)
+            return "<h3>⚠️ Join verification failed.</h3>", 400
 
     # -------------------------
     # Async Post-Join Role Assignment
     # -------------------------
-    async def _apply():
-        try:
-            g = bot.get_guild(target_guild_id)
-            if not g:
-                return
-            m = g.get_member(user_id) or await g.fetch_member(user_id)
-            if not m:
-                return
-            dept = pdata["dept"]
-            subdept = pdata.get("subdept", "N/A")
+    dispatch_role_job(user_id, pdata, joined_with_plan, stages)
+    return render_template("success.html")
 
-            # HQ Role Swap
-            hq = bot.get_guild(HQ_GUILD_ID)
-            if hq:
-                hm = hq.get_member(user_id) or await hq.fetch_member(user_id)
-                if hm:
-                    # remove pending + verified
-                    for rid in (ROLE_PENDING, ROLE_VERIFIED):
-                        if r := hq.get_role(rid):
-                            try: await hm.remove_roles(r, reason="Auth resolved")
-                            except Exception: pass
-                    # add accepted + official
-                    add_roles = [hq.get_role(ACCEPTED_PLATFORM_ROLES.get(platform)), hq.get_role(ROLE_OFFICIAL)]
-                    add_roles = [r for r in add_roles if r]
-                    if add_roles:
-                        try: await hm.add_roles(*add_roles, reason="Application accepted")
-                        except Exception: pass
-
-            # Department assignment
-            if target_guild_id == PS4_GUILD_ID:
-                await assign_ps_roles_ps4(m, dept, subdept)
-            elif target_guild_id == PS5_GUILD_ID:
-                await assign_ps_roles_ps5(m, dept, subdept)
-
-            # Success log
-            if hq and (log_ch := hq.get_channel(AUTH_CODE_LOG_CHANNEL)):
-                await log_ch.send(
-                    f"✅ **Auth Success** — <@{user_id}> | `{dept}` | `{subdept}` | `{platform}`"
-                )
+# -------------------------
+# aiohttp Server Mode (runs on bot.loop)
+# -------------------------
+_templates = jinja2.Environment(loader=jinja2.FileSystemLoader(os.path.join(BASE_DIR, "templates")), autoescape=True)
+
+def render_page(name: str, **ctx) -> web.Response:
+    return web.Response(text=_templates.get_template(name).render(**ctx), content_type="text/html")
+
+def html_error(body: str, status: int) -> web.Response:
+    return web.Response(text=body, status=status, content_type="text/html")
+
+async def aio_health(request: web.Request) -> web.Response:
+    return web.Response(text="✅ Grant Roleplay Network™ Auth Service is running.")
+
+async def aio_metrics(request: web.Request) -> web.Response:
+    if not metrics_allowed(request.remote, request.headers.get("Authorization")):
+        return web.Response(text="Forbidden", status=403)
+    # Off the loop for the state-store read; the loop-owned gauges hop back via run_coroutine_threadsafe
+    body = await asyncio.to_thread(render_metrics)
+    return web.Response(body=body.encode(), headers={"Content-Type": METRICS_CONTENT_TYPE})
+
+@web.middleware
+async def aio_count_response(request: web.Request, handler):
+    status = 500
+    try:
+        resp = await handler(request)
+        status = resp.status
+        return resp
+    except web.HTTPException as e:
+        status = e.status
+        raise
+    finally:
+        if request.path in ("/", "/auth"):
+            inc("grn_http_responses_total", path=request.path, status=str(status))
+
+async def aio_oauth_handler(request: web.Request) -> web.Response:
+    """aiohttp twin of oauth_handler — awaits role assignment before answering."""
+    code = request.query.get("code")
+    if request.method == "GET" and not code:
+        raise web.HTTPFound(oauth_authorize_url(request.query.get("t")))
+    if request.method == "GET":
+        return render_page("auth.html")
+
+    form = await request.post()
+    pin = (form.get("pin") or "").strip()
+    if not pin.isdigit():
+        return html_error("<h3>❌ Invalid code format.</h3>", 400)
+
+    oauth_session: aiohttp.ClientSession = request.app["oauth_session"]
+    stages: Dict[str, float] = {}
+    t = time.perf_counter()
+
+    # Token exchange + identify use the user's bearer token (not the bot session)
+    async with oauth_session.post(f"{DISCORD_API_BASE}/oauth2/token", data=oauth_token_form(code)) as resp:
+        stages["token"], t = time.perf_counter() - t, time.perf_counter()
+        if resp.status == 429:
+            return html_error(RATE_LIMITED_HTML, 429)
+        if resp.status != 200:
+            return html_error(f"<h3>❌ Token exchange failed:</h3><pre>{html.escape(await resp.text())}</pre>", 400)
+        access_token = (await resp.json()).get("access_token")
+    if not access_token:
+        return html_error("<h3>❌ Missing access token.</h3>", 400)
+
+    async with oauth_session.get(f"{DISCORD_API_BASE}/users/@me", headers={"Authorization": f"Bearer {access_token}"}) as resp:
+        stages["identify"], t = time.perf_counter() - t, time.perf_counter()
+        if resp.status == 429:
+            return html_error(RATE_LIMITED_HTML, 429)
+        if resp.status != 200:
+            return html_error(f"<h3>❌ User fetch failed:</h3><pre>{html.escape(await resp.text())}</pre>", 400)
+        me_json = await resp.json()
+    user_id = int(me_json["id"])
+
+    pdata, error = await asyncio.to_thread(check_pending, user_id, pin, request.query.get("state"))
+    if error:
+        return html_error(error, 400)
+    target_guild_id = PLATFORM_GUILDS.get(pdata["platform"])
+    if not target_guild_id:
+        return html_error("<h3>❌ Platform guild not configured.</h3>", 500)
+    if not await asyncio.to_thread(redeem_code, user_id, pdata):
+        return html_error(ALREADY_REDEEMED_HTML, 409)
 
-            # DM user confirmation
+    # Bot-authorised calls share discord.py's session and rate limiter.
+    # The code is already taken — every failure from here on has to give it back.
+    try:
+        join_body = build_join_body(access_token, pdata, user_id, me_json.get("username", ""))
+        try:
+            joined = await bot.http.request(
+                Route("PUT", "/guilds/{guild_id}/members/{user_id}", guild_id=target_guild_id, user_id=user_id),
+                json=join_body,
+            )
+            stages["join"], t = time.perf_counter() - t, time.perf_counter()
+        except discord.HTTPException as e:
+            stages["join"], t = time.perf_counter() - t, time.perf_counter()
+            if not (e.status == 400 and "already" in str(e.text).lower()):
+                await asyncio.to_thread(restore_code, user_id, pdata)
+                return html_error(f"<h3>❌ Guild join failed ({e.status}):</h3><pre>{html.escape(str(e.text))}</pre>", 400)
             try:
-                user = await bot.fetch_user(user_id)
-                e = Embed(
-                    title="✅ Verification Complete",
-                    description="Welcome to **Grant Roleplay Network™** — your access has been granted.",
-                    color=GRN_COLOR
-                ).set_footer(text=FOOTER_TEXT)
-                await user.send(embed=e)
-            except Exception:
-                pass
+                await bot.http.get_member(target_guild_id, user_id)
+            except discord.HTTPException:
+                await asyncio.to_thread(restore_code, user_id, pdata)
+                return html_error("<h3>⚠️ Join verification failed.</h3>", 400)
+            stages["verify"], t = time.perf_counter() - t, time.perf_counter()
+            joined = None
+    except Exception as e:
+        # Network-level failures (aiohttp.ClientError, timeouts) never become HTTPException
+        await asyncio.to_thread(restore_code, user_id, pdata)
+        log_event(AUTH_CODE_LOG_CHANNEL, f"⚠️ Guild join request failed for <@{user_id}>: `{e}`", priority=LOG_ERROR)
+        return html_error(JOIN_UNREACHABLE_HTML, 502)
+
+    # 201 returns the new member; 204 (already a member) returns an empty body
+    ok = await apply_verified_member(user_id, pdata, isinstance(joined, dict) and "nick" in join_body, stages)
+    if not ok:
+        return render_page(
+            "success.html",
+            title="⚠️ Joined — Roles Pending",
+            message="You joined the server, but we couldn’t finish assigning your roles.",
+            detail="Staff have been notified and will finish your setup shortly.",
+        )
+    return render_page("success.html")
 
-        except Exception as e:
-            print("apply roles error:", e)
+async def start_aiohttp_web() -> web.AppRunner:
+    """Serve /, /auth, /metrics and /static on the running bot loop."""
+    app = web.Application(middlewares=[aio_count_response])
+    app.router.add_get("/", aio_health)
+    app.router.add_get("/metrics", aio_metrics)
+    app.router.add_route("*", "/auth", aio_oauth_handler)
+    app.router.add_static("/static", os.path.join(BASE_DIR, "static"))
 
-    asyncio.run_coroutine_threadsafe(_apply(), bot.loop)
+    async def _open_session(app: web.Application):
+        app["oauth_session"] = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=15))
 
-    pending_codes.pop(user_id, None)
-    return render_template("success.html")
+    async def _close_session(app: web.Application):
+        await app["oauth_session"].close()
+
+    app.on_startup.append(_open_session)
+    app.on_cleanup.append(_close_session)
+
+    runner = web.AppRunner(app)
+    await runner.setup()
+    port = int(os.environ.get("PORT", "8080"))
+    await web.TCPSite(runner, "0.0.0.0", port).start()
+    print(f"[🌐] Starting aiohttp web server on port {port}")
+    return runner
 
 # =====================================================
 # Section 6 — Startup & Runner
@@ -1144,8 +3896,36 @@ def oauth_handler():
 async def on_ready():
     """Initialize persistent views, verify HQ connection, and post panel."""
     try:
-        # Register persistent dropdown view so it survives restarts
+        # Register persistent dropdown view + review buttons so they survive restarts
         bot.add_view(ApplicationPanel())
+        bot.add_dynamic_items(ReviewButton)
+
+        # Resolve the role plan against the live guilds + index taken callsigns
+        await validate_role_plan()
+        for platform_guild_id in PLATFORM_GUILDS.values():
+            if g := bot.get_guild(platform_guild_id):
+                index_guild_callsigns(g)
+
+        # Batched staff log delivery
+        start_background_task("log_sink", log_sink_flusher)
+
+        # Write-behind session checkpoints + resume anything a restart interrupted
+        start_background_task("checkpoints", checkpoint_flusher)
+        if "resume" not in background_tasks:
+            start_background_task("resume", resume_checkpointed_applications)
+            start_background_task("review_outbox", retry_review_outbox)
+
+        # Active expiry for unredeemed auth codes + lifting reapply cooldowns
+        start_background_task("code_expiry", code_expiry_sweeper)
+        start_background_task("cooldowns", cooldown_expiry_scheduler)
+        start_background_task("auto_grants", auto_grant_scheduler)
+
+        # Waiting line for the application panel
+        start_background_task("admission", admission_updater)
+
+        # Pick up role jobs queued by separate web workers (shared backends only)
+        if STATE_BACKEND != "memory":
+            start_background_task("role_jobs", role_job_worker)
 
         # Let cache warm up a moment
         await asyncio.sleep(2)
@@ -1171,7 +3951,7 @@ async def on_ready():
 
         print(f"🟢 Ready as {bot.user} ({bot.user.id})")
         print("─────────────────────────────────────────────")
-        print(f"Guilds: {len(bot.guilds)} | Pending Codes: {len(pending_codes)}")
+        print(f"Guilds: {len(bot.guilds)} | Pending Codes: {state_store.count('pending_codes')}")
         print("─────────────────────────────────────────────")
 
     except Exception as e:
@@ -1192,16 +3972,34 @@ def run_web():
         traceback.print_exc()
 
 # -------------------------
-# Launch (Discord + Flask)
+# aiohttp Web Server Runner
+# -------------------------
+async def run_bot_with_aiohttp():
+    """Log in first so bot.http is ready, then serve the web app on the same loop."""
+    async with bot:
+        await bot.login(BOT_TOKEN)
+        runner = await start_aiohttp_web()
+        try:
+            await bot.connect()
+        finally:
+            await runner.cleanup()
+
+# -------------------------
+# Launch (Discord + Web)
 # -------------------------
 if __name__ == "__main__":
     try:
-        # Start the web server in its own thread
-        threading.Thread(target=run_web, daemon=True).start()
-
-        # Launch Discord bot
+        BOT_IN_PROCESS = True
         print("[🚀] Launching GRN Application/Auth System...")
-        bot.run(BOT_TOKEN)
+        if WEB_SERVER_MODE == "aiohttp":
+            discord.utils.setup_logging()
+            asyncio.run(run_bot_with_aiohttp())
+        elif WEB_SERVER_MODE == "none":
+            bot.run(BOT_TOKEN)
+        else:
+            # Start the web server in its own thread
+            threading.Thread(target=run_web, daemon=True).start()
+            bot.run(BOT_TOKEN)
     except KeyboardInterrupt:
         print("[🛑] Manual shutdown received.")
     except Exception as e:
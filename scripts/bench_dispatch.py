@@ -0,0 +1,81 @@
+"""
+Message-dispatch cost with N applicants mid-questionnaire.
+
+old: one bot.wait_for("message", check=...) per applicant, so discord.py runs
+     every pending check on every gateway message (Client.dispatch fan-out)
+new: route_application_answer — one dict lookup into answer_queues
+
+Run from the repo root:  python scripts/bench_dispatch.py
+"""
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+TMP = tempfile.mkdtemp(prefix="grn_bench_")
+os.environ.setdefault("BOT_TOKEN", "bench")
+os.environ.setdefault("STATE_SQLITE_PATH", os.path.join(TMP, "state.db"))
+os.environ.setdefault("CHECKPOINT_PATH", os.path.join(TMP, "checkpoints.db"))
+os.environ.setdefault("ARCHIVE_PATH", os.path.join(TMP, "archive.db"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord  # noqa: E402
+import bot  # noqa: E402
+
+MESSAGES = 20_000
+APPLICANTS = (10, 100, 1000)
+
+# Ordinary guild chatter from someone who is not applying — the common case,
+# and the one the old design paid for with every open application.
+CHATTER = SimpleNamespace(
+    author=SimpleNamespace(id=1, bot=False),
+    guild=SimpleNamespace(id=2),
+    channel=SimpleNamespace(id=3),
+)
+
+async def bench_old(n: int) -> float:
+    client = discord.Client(intents=discord.Intents.none())
+    await client.__aenter__()  # binds client.loop without logging in
+    waiters = []
+    for uid in range(1000, 1000 + n):
+        def check(m, uid=uid):
+            return m.author.id == uid and isinstance(m.channel, discord.DMChannel)
+        waiters.append(asyncio.ensure_future(client.wait_for("message", check=check)))
+    await asyncio.sleep(0)  # let every wait_for register its listener
+
+    t = time.perf_counter()
+    for _ in range(MESSAGES):
+        client.dispatch("message", CHATTER)
+    elapsed = time.perf_counter() - t
+
+    for w in waiters:
+        w.cancel()
+    await asyncio.gather(*waiters, return_exceptions=True)
+    await client.close()
+    return elapsed
+
+async def bench_new(n: int) -> float:
+    for uid in range(1000, 1000 + n):
+        bot.open_answer_queue(uid)
+
+    t = time.perf_counter()
+    for _ in range(MESSAGES):
+        await bot.route_application_answer(CHATTER)
+    elapsed = time.perf_counter() - t
+
+    for uid in range(1000, 1000 + n):
+        bot.close_answer_queue(uid)
+    return elapsed
+
+async def main():
+    print(f"{MESSAGES} messages per run, µs per message")
+    print(f"{'applicants':>10} {'wait_for':>10} {'queues':>10} {'speedup':>8}")
+    for n in APPLICANTS:
+        old = await bench_old(n) / MESSAGES * 1e6
+        new = await bench_new(n) / MESSAGES * 1e6
+        print(f"{n:>10} {old:>10.2f} {new:>10.2f} {old / new:>7.0f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,139 @@
+"""
+Auth server throughput: Flask thread (WEB_SERVER_MODE=flask) vs aiohttp on the
+bot loop (WEB_SERVER_MODE=aiohttp).
+
+Each server runs in its own process and talks to a local fake Discord API
+that answers /oauth2/token and /users/@me after DISCORD_LATENCY seconds, so
+every POST /auth spends its time the way a real one does — waiting on two
+upstream round-trips — before failing the pending-code check with a 400.
+
+Run from the repo root:  python scripts/bench_web.py [requests] [concurrency]
+"""
+import asyncio
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+from aiohttp import web
+
+REPO = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DISCORD_LATENCY = 0.05
+MODES = ("flask", "aiohttp")
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# -------------------------
+# Server side (child process)
+# -------------------------
+def serve(mode: str, api_base: str, port: int):
+    tmp = tempfile.mkdtemp(prefix="grn_bench_")
+    os.environ.update({
+        "BOT_TOKEN": "bench",
+        "PORT": str(port),
+        "STATE_SQLITE_PATH": os.path.join(tmp, "state.db"),
+        "CHECKPOINT_PATH": os.path.join(tmp, "checkpoints.db"),
+        "ARCHIVE_PATH": os.path.join(tmp, "archive.db"),
+    })
+    sys.path.insert(0, REPO)
+    import logging
+    import bot
+
+    bot.DISCORD_API_BASE = api_base
+    bot.discord_rest.base_url = api_base
+    logging.getLogger("werkzeug").setLevel(logging.ERROR)
+
+    if mode == "flask":
+        bot.flask_app.run(host="127.0.0.1", port=port)  # threaded, as run_web starts it
+    else:
+        async def main():
+            await bot.start_aiohttp_web()
+            await asyncio.Event().wait()
+        asyncio.run(main())
+
+# -------------------------
+# Fake Discord + load generator (parent process)
+# -------------------------
+async def fake_token(request: web.Request) -> web.Response:
+    await asyncio.sleep(DISCORD_LATENCY)
+    return web.json_response({"access_token": "bench"})
+
+async def fake_me(request: web.Request) -> web.Response:
+    await asyncio.sleep(DISCORD_LATENCY)
+    return web.json_response({"id": "4242", "username": "bench"})
+
+async def wait_until_up(url: str, proc: subprocess.Popen):
+    async with aiohttp.ClientSession() as s:
+        for _ in range(200):
+            if proc.poll() is not None:
+                raise RuntimeError("server process exited")
+            try:
+                async with s.get(url) as r:
+                    if r.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.1)
+    raise RuntimeError(f"{url} never came up")
+
+async def load(url: str, total: int, concurrency: int):
+    latencies, statuses = [], {}
+    remaining = iter(range(total))
+    conn = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=conn) as s:
+        async def worker():
+            for _ in remaining:
+                t = time.perf_counter()
+                async with s.post(f"{url}/auth?code=bench", data={"pin": "123456"}) as r:
+                    await r.read()
+                    statuses[r.status] = statuses.get(r.status, 0) + 1
+                latencies.append(time.perf_counter() - t)
+
+        t = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        wall = time.perf_counter() - t
+    latencies.sort()
+    return wall, latencies, statuses
+
+async def main(total: int, concurrency: int):
+    api = web.Application()
+    api.router.add_post("/api/oauth2/token", fake_token)
+    api.router.add_get("/api/users/@me", fake_me)
+    runner = web.AppRunner(api)
+    await runner.setup()
+    api_port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", api_port).start()
+    api_base = f"http://127.0.0.1:{api_port}/api"
+
+    print(f"{total} POST /auth, concurrency {concurrency}, fake Discord latency {DISCORD_LATENCY * 1000:.0f}ms per call")
+    print(f"{'mode':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}  statuses")
+    for mode in MODES:
+        port = free_port()
+        proc = subprocess.Popen([sys.executable, __file__, "--serve", mode, api_base, str(port)],
+                                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            url = f"http://127.0.0.1:{port}"
+            await wait_until_up(url + "/", proc)
+            await load(url, min(total, 50), concurrency)  # warm-up
+            wall, lat, statuses = await load(url, total, concurrency)
+        finally:
+            proc.terminate()
+            proc.wait()
+        pct = lambda p: lat[min(len(lat) - 1, int(p * len(lat)))] * 1000
+        print(f"{mode:>8} {total / wall:>8.1f} {statistics.median(lat) * 1000:>8.1f} {pct(0.95):>8.1f} {pct(0.99):>8.1f}  {statuses}")
+
+    await runner.cleanup()
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    else:
+        args = [int(a) for a in sys.argv[1:3]]
+        asyncio.run(main(*(args + [2000, 100][len(args):])))